@@ -18,6 +18,7 @@ DEFAULT_CONFIG = {
         'hide_pieces': 0,
         'hide_moves': '',
         'use_drops': False,
+        'lazy_moves': False,
     },
     "SEED": {
         'block_ids': '',
@@ -72,6 +73,14 @@ DEFAULT_CONFIG = {
         'sync_port': 58084,
         'sync_time': 0,
     },
+    "PLAY": {
+        'engine_time': 5.0,
+        'engine_depth': 0,
+        'engine_nodes': 0,
+        'use_mcts': '',
+        'mcts_playouts': 100,
+        'mcts_depth': 10,
+    },
 }
 
 
@@ -95,9 +104,11 @@ class Config(dict):
                         self[item] = self.base_config.getboolean(section, item)
                     if type(DEFAULT_CONFIG.get(section, {}).get(item, {})) is int:
                         self[item] = self.base_config.getint(section, item)
+                    if type(DEFAULT_CONFIG.get(section, {}).get(item, {})) is float:
+                        self[item] = self.base_config.getfloat(section, item)
                 except ValueError:
                     self[item] = DEFAULT_CONFIG[section][item]
-                if item in {'hide_moves', 'log_pass', 'status_string', 'timestamp', 'verbose'}:
+                if item in {'hide_moves', 'log_pass', 'status_string', 'timestamp', 'use_mcts', 'verbose'}:
                     try:
                         self[item] = self.base_config.getboolean(section, item)
                     except ValueError:
@@ -154,7 +154,8 @@ def debug_info(board: Board) -> list[str]:
     else:
         debug_log[-1] += " None"
     debug_log.append(f"Visual board size: {board.visual_board_width}x{board.visual_board_height}")
-    debug_log.append(f"Screen size: {board.width}x{board.height}")
+    if hasattr(board, 'width'):  # headless game states do not have a screen
+        debug_log.append(f"Screen size: {board.width}x{board.height}")
     debug_log.append(f"Square size: {board.square_size}")
     debug_log.append(f"Windowed screen size: {board.windowed_size[0]}x{board.windowed_size[1]}")
     debug_log.append(f"Windowed square size: {board.windowed_square_size}")
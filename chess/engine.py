@@ -0,0 +1,310 @@
+from __future__ import annotations
+
+from argparse import ArgumentParser
+from collections.abc import Callable
+from math import inf
+from time import perf_counter
+
+from chess.game import GameState
+from chess.movement.move import Move
+from chess.perft import legal_moves, new_state
+from chess.pieces.piece import AbstractPiece
+from chess.pieces.side import Side
+
+# a plain negamax alpha-beta search on top of the same move generator that the game itself uses. the generator already
+# takes care of all the rules (checks, end conditions, chains, drops, you name it), so all the engine has to know is how
+# to make and take back moves and how to score a position, which means it works for anything the game can load. it is
+# not a strong engine by any means, but it looks a few plies ahead and doesn't hang pieces, which is the point of it all
+
+Evaluation = Callable[[GameState, Side], float]  # score of a position from the point of view of the given side
+
+WIN_SCORE = 1000000  # score of a won position, minus the ply count so that quicker wins and slower losses are preferred
+MATE_SCORE = WIN_SCORE - 10000  # anything above this is a forced result rather than an evaluation
+
+EXACT, LOWER, UPPER = 0, 1, 2  # transposition table bound types
+
+
+class SearchTimeout(Exception):
+    pass
+
+
+class Engine(object):
+    def __init__(
+        self,
+        evaluate: Evaluation | None = None,
+        time_limit: float | None = None,
+        depth_limit: int | None = None,
+        node_limit: int | None = None,
+        quiescence: int = 4,
+    ):
+        self.evaluate = evaluate or self.material  # position evaluation function (see Evaluation above)
+        self.time_limit = time_limit  # seconds per search, None for no limit
+        self.depth_limit = depth_limit  # plies per search, None for no limit
+        self.node_limit = node_limit  # positions per search, None for no limit
+        self.quiescence = quiescence  # how many plies of captures to look through past the search horizon
+        self.table_size = 1 << 18  # the tables are cleared once they grow larger than this
+        self.table = {}  # transposition table, as {position key: (depth, score, bound, best move string)}
+        self.checks = {}  # moves that were seen giving check, as {position key: {move string}}
+        self.killers = {}  # quiet moves that caused a cutoff, as {ply: [move string]}
+        self.values = {}  # piece values, as {piece type: value}
+        self.deadline = None  # time at which the current search has to stop
+        self.nodes = 0  # number of positions visited during the current search
+        self.depth = 0  # last fully searched depth
+        self.score = 0  # score of the best move, from the point of view of the side to move
+        self.best_move = None  # best move found so far
+        self.show = False  # whether to print the results of every iteration
+
+    def piece_value(self, piece: AbstractPiece) -> float:
+        # average number of squares the piece can reach from a square of an (almost) empty board. crude, but it works
+        # for any piece the game can come up with, and it does put the orthodox pieces in more or less the right order
+        if (value := self.values.get(type(piece))) is not None:
+            return value
+        if not piece.movement:
+            self.values[type(piece)] = 0
+            return 0
+        state = piece.board
+        read_squares, state.read_squares = state.read_squares, None
+        total, count = 0, 0
+        for pos in list(state.squares):
+            if state.not_on_board(pos):
+                continue
+            total += len({move.pos_to for move in piece.movement.moves(pos, piece, True) if move.pos_to != pos})
+            count += 1
+        state.read_squares = read_squares
+        value = self.values[type(piece)] = total / count if count else 0
+        return value
+
+    def material(self, state: GameState, side: Side) -> float:
+        # piece values (royals don't count, losing them is what the end conditions are for), plus a small bonus for
+        # every square that the pieces can reach from where they are right now, to get them out of the corners
+        score = 0
+        for piece_side, sign in ((side, 1), (side.opponent(), -1)):
+            royals = {id(piece) for piece in state.royal_pieces[piece_side]}
+            reach = state.theoretical_moves.get(piece_side, {})
+            for piece in state.movable_pieces[piece_side]:
+                if id(piece) not in royals:
+                    score += sign * self.piece_value(piece)
+                score += sign * len(reach.get(piece.board_pos, ())) / 10
+            if state.use_drops:
+                for piece_type in state.captured_pieces[piece_side]:
+                    score += sign * self.values.get(piece_type, 1)
+        return score
+
+    def terminal(self, state: GameState, ply: int) -> float:
+        if state.win_side == state.turn_side:
+            return WIN_SCORE - ply
+        if state.win_side == state.turn_side.opponent():
+            return ply - WIN_SCORE
+        return 0
+
+    def count_node(self) -> None:
+        self.nodes += 1
+        if self.node_limit is not None and self.nodes > self.node_limit:
+            raise SearchTimeout
+        if self.deadline is not None and perf_counter() > self.deadline:
+            raise SearchTimeout
+
+    def order(
+        self, moves: list[Move], key: tuple | None, best_string: str | None, ply: int
+    ) -> list[tuple[int, str]]:
+        # best move from the table, then captures (most valuable victim first, least valuable attacker first among
+        # those), then moves that gave check the last time we were here, then promotions, then killers, then the rest
+        checks = self.checks.get(key, ()) if key is not None else ()
+        killers = self.killers.get(ply, ())
+
+        def priority(item: tuple[int, str]) -> tuple[int, float]:
+            index, string = item
+            move = moves[index]
+            if string == best_string:
+                return 0, 0
+            if move.captured:
+                gain = sum(self.piece_value(piece) for piece in move.captured) * 100
+                return 1, -gain + (self.piece_value(move.piece) if move.piece else 0)
+            if string in checks:
+                return 2, 0
+            if isinstance(move.promotion, AbstractPiece):
+                return 3, -self.piece_value(move.promotion)
+            if string in killers:
+                return 4, 0
+            return 5, 0
+
+        return sorted(((index, str(move)) for index, move in enumerate(moves)), key=priority)
+
+    @staticmethod
+    def fetch(state: GameState, index: int, string: str) -> Move | None:
+        # undo_last_move() puts copies of the pieces back on the board, which leaves the pieces of every move that was
+        # generated before it stale. so the move to make is always picked from a freshly loaded list (which is cheap,
+        # since the moves of a position we've just returned to are cached), and it should be at the same index as before
+        moves = legal_moves(state)
+        if index < len(moves) and str(moves[index]) == string:
+            return moves[index]
+        # not there if the position has probabilistic pieces that rolled differently this time around. nothing we can do
+        return next((move for move in moves if str(move) == string), None)
+
+    def make_and_search(
+        self, state: GameState, index: int, string: str, key: tuple | None,
+        depth: int, alpha: float, beta: float, ply: int,
+    ) -> float | None:
+        if (move := self.fetch(state, index, string)) is None:
+            return None
+        side = state.turn_side
+        log_size, verbose_size = len(state.log_data), len(state.verbose_data)
+        state.auto(move, update=False)
+        try:
+            if key is not None and state.check_side not in {Side.NONE, side}:
+                self.checks.setdefault(key, set()).add(string)
+            if state.turn_side == side:  # same side moves again (e.g. a chained move or a custom turn order)
+                return self.negamax(state, depth, alpha, beta, ply)
+            return -self.negamax(state, depth, -beta, -alpha, ply)
+        finally:
+            state.undo_last_move()
+            del state.log_data[log_size:]
+            del state.verbose_data[verbose_size:]
+
+    def negamax(self, state: GameState, depth: int, alpha: float, beta: float, ply: int) -> float:
+        self.count_node()
+        if state.game_over:
+            return self.terminal(state, ply)
+        if state.promotion_piece is not None:
+            return self.evaluate(state, state.turn_side)  # a promotion that needs to be picked by hand, can't go on
+        moves = legal_moves(state)
+        if not moves:
+            return self.evaluate(state, state.turn_side)
+        key = best_string = None
+        best_score = -inf
+        if depth <= 0:  # quiescence search, i.e. only look at captures until the position calms down
+            best_score = self.evaluate(state, state.turn_side)
+            if best_score >= beta or depth <= -self.quiescence:
+                return best_score
+            alpha = max(alpha, best_score)
+        elif (key := state.get_moves_key()) is not None and (entry := self.table.get(key)):
+            entry_depth, score, bound, best_string = entry
+            if score > MATE_SCORE:
+                score -= ply
+            elif score < -MATE_SCORE:
+                score += ply
+            if entry_depth >= depth and (
+                bound == EXACT or bound == LOWER and score >= beta or bound == UPPER and score <= alpha
+            ):
+                return score
+        alpha_start = alpha
+        for index, string in self.order(moves, key, best_string, ply):
+            if depth <= 0 and not moves[index].captured:
+                continue
+            score = self.make_and_search(state, index, string, key, depth - 1, alpha, beta, ply + 1)
+            if score is None:
+                continue
+            if score > best_score:
+                best_score, best_string = score, string
+            if score > alpha:
+                alpha = score
+            if alpha >= beta:
+                if not moves[index].captured:
+                    killers = self.killers.setdefault(ply, [])
+                    if string not in killers:
+                        killers[:] = [string, *killers[:1]]
+                break
+        if key is not None and best_score > -inf:
+            bound = LOWER if best_score >= beta else UPPER if best_score <= alpha_start else EXACT
+            self.store(key, depth, best_score, bound, best_string, ply)
+        return best_score
+
+    def store(self, key: tuple, depth: int, score: float, bound: int, string: str | None, ply: int) -> None:
+        if len(self.table) >= self.table_size:
+            self.table.clear()
+            self.checks.clear()
+        if score > MATE_SCORE:
+            score += ply  # forced results are stored relative to the position itself, not to the root of the search
+        elif score < -MATE_SCORE:
+            score -= ply
+        self.table[key] = depth, score, bound, string
+
+    def search_root(self, state: GameState, depth: int) -> None:
+        moves = legal_moves(state)
+        key = state.get_moves_key()
+        best_string = str(self.best_move) if self.best_move else None
+        alpha = -inf
+        for index, string in self.order(moves, key, best_string, 0):
+            score = self.make_and_search(state, index, string, key, depth - 1, alpha, inf, 1)
+            if score is not None and score > alpha:
+                # the previous best move is always searched first, so anything that beats it is safe to play even if
+                # the search has to stop before this iteration is over
+                alpha = score
+                self.best_move, self.score = moves[index], score
+        if key is not None:
+            self.store(key, depth, alpha, EXACT, str(self.best_move), 0)
+
+    def search(self, state: GameState) -> Move | None:
+        moves = legal_moves(state)
+        self.best_move, self.score, self.depth, self.nodes = None, 0, 0, 0
+        if not moves:
+            return None
+        self.killers.clear()
+        start = perf_counter()
+        time_limit = self.time_limit
+        if time_limit is None and self.depth_limit is None and self.node_limit is None:
+            time_limit = 5.0  # searching forever is never what anyone wants
+        self.deadline = None if time_limit is None else start + time_limit
+        flags = state.verbose, state.do_auto_save, state.auto_moves
+        state.verbose, state.do_auto_save, state.auto_moves = None, False, False
+        future_move_history = state.future_move_history.copy()
+        try:
+            while self.depth_limit is None or self.depth < self.depth_limit:
+                try:
+                    self.search_root(state, self.depth + 1)
+                except SearchTimeout:
+                    break
+                self.depth += 1
+                if self.show:
+                    elapsed = perf_counter() - start
+                    print(
+                        f"  Depth {self.depth}: {self.best_move} ({self.score:+.2f}), "
+                        f"nodes: {self.nodes}, time: {elapsed:.3f}s"
+                    )
+                if len(moves) == 1 or abs(self.score) > MATE_SCORE:
+                    break  # nothing to think about
+        finally:
+            state.verbose, state.do_auto_save, state.auto_moves = flags
+            state.future_move_history = future_move_history
+        # same as in fetch(), the move is picked from a fresh list so that it can be made right away
+        moves = legal_moves(state)
+        string = str(self.best_move) if self.best_move else None
+        self.best_move = next((move for move in moves if str(move) == string), moves[0] if moves else None)
+        return self.best_move
+
+
+def main() -> None:
+    parser = ArgumentParser(description="Search for the best move in a given position (and optionally play it out).")
+    parser.add_argument('-w', '--white', type=int, default=0, help="white army index in piece_groups (default: 0)")
+    parser.add_argument('-b', '--black', type=int, default=None, help="black army index (default: same as white)")
+    parser.add_argument('-s', '--save', default=None, help="load the starting position from a save file instead")
+    parser.add_argument('-r', '--roll-seed', type=int, default=0, help="roll seed for probabilistic movement")
+    parser.add_argument('-t', '--time', type=float, default=None, help="seconds per move (default: 5 if no limits)")
+    parser.add_argument('-d', '--depth', type=int, default=None, help="search depth in plies (default: no limit)")
+    parser.add_argument('-n', '--nodes', type=int, default=None, help="positions per move (default: no limit)")
+    parser.add_argument('-q', '--quiescence', type=int, default=4, help="capture search depth in plies (default: 4)")
+    parser.add_argument('-p', '--plies', type=int, default=1, help="number of moves to play (default: 1)")
+    args = parser.parse_args()
+
+    white, black = args.white, args.white if args.black is None else args.black
+    state = new_state(white, black, args.save, args.roll_seed)
+    if args.save:
+        print(args.save)
+    else:
+        print(f"{state.piece_set_names[Side.WHITE]} vs. {state.piece_set_names[Side.BLACK]}")
+    engine = Engine(None, args.time, args.depth, args.nodes, args.quiescence)
+    engine.show = True
+    for ply in range(args.plies):
+        move = engine.search(state)
+        if move is None:
+            break
+        print(f"{state.turn_side}: {move}")
+        state.auto(move, update=False)
+        if state.promotion_piece is not None:
+            break
+    if state.game_over:
+        print(f"Game over: {state.win_side if state.win_side != Side.NONE else 'draw'} ({state.end_condition})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,210 @@
+from __future__ import annotations
+
+from argparse import ArgumentParser
+from copy import copy
+from math import exp, log, sqrt
+from random import Random
+from time import perf_counter
+
+from chess.engine import Engine, Evaluation
+from chess.game import GameState
+from chess.movement.move import Move
+from chess.perft import legal_moves, new_state
+from chess.pieces.side import Side
+
+# monte carlo tree search, for the armies that alpha-beta can't make much sense of. pieces with probabilistic movement
+# roll for their moves every turn, so what can be played next depends on luck as much as on the position itself. here
+# those rolls are chance nodes: every time a move is tried, the rolls that follow it are made again, and each different
+# outcome gets a subtree of its own, so the statistics of a move end up averaged over all the ways its rolls can go
+
+
+class Node(object):
+    def __init__(self):
+        self.visits = 0  # number of playouts that went through this position
+        self.edges = {}  # moves that were tried from this position, as {move string: Edge}
+
+
+class Edge(object):
+    def __init__(self):
+        self.visits = 0  # number of playouts that started with this move
+        self.score = 0.0  # sum of their results, from the point of view of the side that made the move
+        self.outcomes = {}  # positions this move led to, as {rolls made after the move: Node}
+
+
+class Mcts(object):
+    def __init__(
+        self,
+        evaluate: Evaluation | None = None,
+        playouts: int | None = 100,
+        time_limit: float | None = None,
+        playout_depth: int = 10,
+        exploration: float = 1.4,
+        seed: int | None = None,
+    ):
+        self.evaluate = evaluate or Engine().material  # used to score playouts that didn't finish the game
+        self.playouts = playouts  # playouts per search, None for no limit
+        self.time_limit = time_limit  # seconds per search, None for no limit
+        self.playout_depth = playout_depth  # plies per playout before the position gets evaluated instead
+        self.exploration = exploration  # how much to favor moves that were tried less (UCB1 constant)
+        self.scale = 10.0  # evaluation difference that corresponds to about 3:1 odds of winning
+        self.rng = Random(seed)  # used for picking moves, rolls use the game's own roll_rng as usual
+        self.root = None  # search tree of the last search
+        self.count = 0  # number of playouts made during the last search
+        self.plies = 0  # number of moves made during the last search
+        self.score = 0.0  # expected result of the best move, from 0 (loss) to 1 (win)
+        self.best_move = None  # best move found during the last search
+        self.show = False  # whether to print the search results
+
+    def make(self, state: GameState, move: Move) -> tuple:
+        # forget the rolls of whatever was played from here before, so that the ones after this move are made anew
+        state.clear_future_history(state.ply_count)
+        state.auto(move, update=False)
+        self.plies += 1
+        rolls = state.roll_history[state.ply_count - 1] if 0 < state.ply_count <= len(state.roll_history) else {}
+        return tuple(sorted(rolls.items()))
+
+    def result(self, state: GameState) -> float:
+        # result of the playout for white, from 0 (loss) to 1 (win)
+        if state.game_over:
+            if state.win_side == Side.WHITE:
+                return 1.0
+            if state.win_side == Side.BLACK:
+                return 0.0
+            return 0.5
+        return 1 / (1 + exp(max(-50.0, min(50.0, -self.evaluate(state, Side.WHITE) / self.scale))))
+
+    def select(self, node: Node, moves: dict[str, Move]) -> str:
+        untried = [string for string in moves if string not in node.edges]
+        if untried:
+            return self.rng.choice(untried)
+        factor = self.exploration * sqrt(log(node.visits))
+        return max(
+            (string for string in moves),
+            key=lambda s: node.edges[s].score / node.edges[s].visits + factor / sqrt(node.edges[s].visits)
+        )
+
+    def iterate(self, state: GameState) -> None:
+        node, path, made = self.root, [], 0
+        log_size, verbose_size = len(state.log_data), len(state.verbose_data)
+        try:
+            # selection and expansion: follow the tree down until a move leads somewhere new
+            while not state.game_over and state.promotion_piece is None:
+                moves = {}
+                for move in legal_moves(state):
+                    moves.setdefault(str(move), move)
+                if not moves:
+                    break
+                string = self.select(node, moves)
+                edge = node.edges.setdefault(string, Edge())
+                path.append((node, edge, state.turn_side))
+                outcome = self.make(state, moves[string])
+                made += 1
+                if outcome not in edge.outcomes:
+                    edge.outcomes[outcome] = Node()
+                    break
+                node = edge.outcomes[outcome]
+            # simulation: play random moves for a while, then see who's doing better
+            for _ in range(self.playout_depth):
+                if state.game_over or state.promotion_piece is not None:
+                    break
+                moves = legal_moves(state)
+                if not moves:
+                    break
+                self.make(state, self.rng.choice(moves))
+                made += 1
+            result = self.result(state)
+            # backpropagation
+            for node, edge, side in path:
+                node.visits += 1
+                edge.visits += 1
+                edge.score += result if side == Side.WHITE else 1 - result
+            self.count += 1
+        finally:
+            for _ in range(made):
+                state.undo_last_move()
+            del state.log_data[log_size:]
+            del state.verbose_data[verbose_size:]
+
+    def search(self, state: GameState) -> Move | None:
+        moves = legal_moves(state)
+        self.root, self.count, self.plies, self.score, self.best_move = Node(), 0, 0, 0.0, None
+        if not moves:
+            return None
+        start = perf_counter()
+        playouts, time_limit = self.playouts, self.time_limit
+        if playouts is None and time_limit is None:
+            time_limit = 5.0  # same as in Engine.search()
+        deadline = None if time_limit is None else start + time_limit
+        flags = state.verbose, state.do_auto_save, state.auto_moves
+        state.verbose, state.do_auto_save, state.auto_moves = None, False, False
+        history = (
+            state.future_move_history.copy(),
+            [copy(rolls) for rolls in state.roll_history],
+            [copy(pieces) for pieces in state.probabilistic_piece_history],
+        )
+        rng_state = state.roll_rng.getstate() if state.roll_rng else None
+        try:
+            while (playouts is None or self.count < playouts) and (deadline is None or perf_counter() < deadline):
+                self.iterate(state)
+                if len(moves) == 1:
+                    break  # nothing to think about
+        finally:
+            state.verbose, state.do_auto_save, state.auto_moves = flags
+            state.future_move_history, state.roll_history, state.probabilistic_piece_history = history
+            if rng_state is not None:
+                state.roll_rng.setstate(rng_state)
+        elapsed = perf_counter() - start
+        string, edge = max(self.root.edges.items(), key=lambda x: x[1].visits, default=(None, None))
+        if edge is not None:
+            self.score = edge.score / edge.visits
+        if self.show:
+            print(
+                f"  Playouts: {self.count}, plies: {self.plies}, time: {elapsed:.3f}s, "
+                f"playouts/sec: {self.count / elapsed if elapsed else 0:.1f}, "
+                f"plies/sec: {self.plies / elapsed if elapsed else 0:.1f}"
+            )
+            for s, e in sorted(self.root.edges.items(), key=lambda x: -x[1].visits)[:5]:
+                print(f"  {s}: {e.visits} playouts, {e.score / e.visits:.1%} ({len(e.outcomes)} outcomes)")
+        # the moves we made have left the ones we had stale (see Engine.fetch()), so the move is picked again here
+        moves = legal_moves(state)
+        self.best_move = next((move for move in moves if str(move) == string), moves[0] if moves else None)
+        return self.best_move
+
+
+def main() -> None:
+    parser = ArgumentParser(description="Search for the best move in a given position using random playouts.")
+    parser.add_argument('-w', '--white', type=int, default=0, help="white army index in piece_groups (default: 0)")
+    parser.add_argument('-b', '--black', type=int, default=None, help="black army index (default: same as white)")
+    parser.add_argument('-s', '--save', default=None, help="load the starting position from a save file instead")
+    parser.add_argument('-r', '--roll-seed', type=int, default=0, help="roll seed for probabilistic movement")
+    parser.add_argument('-n', '--playouts', type=int, default=None, help="playouts per move (default: 100)")
+    parser.add_argument('-t', '--time', type=float, default=None, help="seconds per move (default: no limit)")
+    parser.add_argument('-l', '--length', type=int, default=10, help="plies per playout (default: 10)")
+    parser.add_argument('-c', '--exploration', type=float, default=1.4, help="exploration constant (default: 1.4)")
+    parser.add_argument('-p', '--plies', type=int, default=1, help="number of moves to play (default: 1)")
+    parser.add_argument('--seed', type=int, default=None, help="seed for picking moves")
+    args = parser.parse_args()
+
+    white, black = args.white, args.white if args.black is None else args.black
+    state = new_state(white, black, args.save, args.roll_seed)
+    if args.save:
+        print(args.save)
+    else:
+        print(f"{state.piece_set_names[Side.WHITE]} vs. {state.piece_set_names[Side.BLACK]}")
+    playouts = 100 if args.playouts is None and args.time is None else args.playouts
+    mcts = Mcts(None, playouts, args.time, args.length, args.exploration, args.seed)
+    mcts.show = True
+    for ply in range(args.plies):
+        move = mcts.search(state)
+        if move is None:
+            break
+        print(f"{state.turn_side}: {move}")
+        state.auto(move, update=False)
+        if state.promotion_piece is not None:
+            break
+    if state.game_over:
+        print(f"Game over: {state.win_side if state.win_side != Side.NONE else 'draw'} ({state.end_condition})")
+
+
+if __name__ == '__main__':
+    main()
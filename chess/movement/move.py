@@ -146,11 +146,11 @@ class Move(object):
             self.pos_from,
             self.pos_to,
             self.movement_type,
-            self.piece.__copy__() if self.piece else self.piece,
-            [x.__copy__() for x in self.captured],
-            self.swapped_piece.__copy__() if self.swapped_piece else self.swapped_piece,
+            self.piece.clone() if self.piece else self.piece,
+            [x.clone() for x in self.captured],
+            self.swapped_piece.clone() if self.swapped_piece else self.swapped_piece,
             self.placed_piece,
-            self.promotion.__copy__() if self.promotion else self.promotion,
+            self.promotion.clone() if self.promotion else self.promotion,
             self.chained_move.__deepcopy__(memo) if self.chained_move else self.chained_move,
             self.marks,
             self.tag,
@@ -287,3 +287,66 @@ class Move(object):
                 else:
                     string += f"{comma} {promotes} to {name(type(self.promotion))}"
         return string
+
+
+class MoveHistory(list):
+    # list of moves that also keeps track of which of them took a ply (i.e. all but the edits), so that looking up the
+    # n-th last (or first) move made doesn't need to walk through the whole history to skip the edits along the way
+    def __init__(self, moves: Collection[Move | None] = ()):
+        super().__init__(moves)
+        self.plies = []  # indices of the moves that took a ply, in order
+        self.reindex()
+
+    def reindex(self) -> None:
+        self.plies = [i for i, move in enumerate(self) if not move or not move.is_edit]
+
+    def ply(self, count: int) -> Move | None:
+        # n-th move made if count is positive, n-th last move made if it's negative. raises IndexError if out of range
+        if not count:
+            raise IndexError(count)
+        return self[self.plies[count - 1 if count > 0 else count]]
+
+    def append(self, move: Move | None) -> None:
+        if not move or not move.is_edit:
+            self.plies.append(len(self))
+        super().append(move)
+
+    def pop(self, index: int = -1) -> Move | None:
+        move = super().pop(index)
+        if index in {-1, len(self)}:
+            if self.plies and self.plies[-1] == len(self):
+                self.plies.pop()
+        else:
+            self.reindex()
+        return move
+
+    def __setitem__(self, index, value) -> None:
+        if isinstance(index, int):
+            old = self[index]
+            super().__setitem__(index, value)
+            if (not old or not old.is_edit) == (not value or not value.is_edit):
+                return  # still (not) taking a ply, so the indices stay the same
+        else:
+            super().__setitem__(index, value)
+        self.reindex()
+
+    def __delitem__(self, index) -> None:
+        super().__delitem__(index)
+        self.reindex()
+
+    def __iadd__(self, other):
+        result = super().__iadd__(other)
+        self.reindex()
+        return result
+
+    def extend(self, moves) -> None:
+        super().extend(moves)
+        self.reindex()
+
+    def insert(self, index, move) -> None:
+        super().insert(index, move)
+        self.reindex()
+
+    def clear(self) -> None:
+        super().clear()
+        self.plies.clear()
@@ -3,7 +3,7 @@ from __future__ import annotations
 from copy import copy
 from itertools import chain
 from math import ceil, floor
-from typing import TYPE_CHECKING, Any, Collection
+from typing import TYPE_CHECKING, Any, Collection, Sequence
 
 from chess.movement.base import BaseMovement
 from chess.movement.move import Move
@@ -78,7 +78,8 @@ class RiderMovement(BaseMovement):
         self.loop = loop
         self.data = {}
         self.steps = 0
-        self.bounds = []
+        self.bounds = ()
+        self.ray = []
 
     def initialize_direction(self, direction: AnyDirection, pos_from: Position, piece: Piece) -> None:
         pass
@@ -90,26 +91,31 @@ class RiderMovement(BaseMovement):
         return pos
 
     def in_bounds(self, pos: Position) -> bool:
-        return all(self.bounds[i][0] <= pos[i] < self.bounds[i][1] for i in range(2))
+        bounds = self.bounds
+        return bounds[0][0] <= pos[0] < bounds[0][1] and bounds[1][0] <= pos[1] < bounds[1][1]
+
+    def get_ray(self, pos_from: Position, direction: Direction) -> list[Position]:
+        # squares passed through when moving from pos_from in the given direction, up to and including the first square
+        # that is out of bounds, or the square where the ray gets back to pos_from if it loops around the board
+        key = type(self).transform, self.boundless, pos_from, direction
+        if (ray := self.board.rays.get(key)) is None:
+            ray = [self.transform(pos_from)]
+            current_pos = pos_from
+            while len(ray) < 2 or self.in_bounds(ray[-1]) and ray[-1] != ray[0]:
+                current_pos = add(current_pos, direction)
+                ray.append(self.transform(current_pos))
+            self.board.rays[key] = ray
+        return ray
+
+    def ray_pos(self, steps: int) -> Position:
+        # position after the given number of steps along the current ray (looping rays repeat from the start)
+        ray = self.ray
+        return ray[steps] if steps < len(ray) else ray[steps % (len(ray) - 1)]
 
     def moves(self, pos_from: Position, piece: Piece, theoretical: bool = False):
         if self.board.not_on_board(pos_from):
             return
-        board_size = self.board.board_height, self.board.board_width
-        board_offset = self.board.notation_offset[1], self.board.notation_offset[0]
-        board_bounds = [[x + board_offset[i] for x in (0, board_size[i])] for i in range(2)]
-        if self.boundless:
-            self.bounds = [board_bounds[i][:] for i in range(2)]
-        else:
-            bounds = [self.board.border_rows, self.board.border_cols]
-            bounds = [[board_bounds[i][0]] + bounds[i] + [board_bounds[i][-1]] for i in range(2)]
-            self.bounds = [
-                [
-                    max(x for x in bounds[i] if x <= pos_from[i]),
-                    min(x for x in bounds[i] if x > pos_from[i])
-                ] for i in range(2)
-            ]
-        bounds = self.bounds
+        bounds = self.bounds = self.board.board_bounds if self.boundless else self.board.ray_bounds[pos_from]
         direction_id = 0
         while direction_id < len(self.directions):
             direction = piece.side.direction(self.directions[direction_id])
@@ -124,24 +130,22 @@ class RiderMovement(BaseMovement):
             # we set self.steps to this value on update and after each yield to make sure the step count is correct
             self.data = {}  # we also do the same to self.data - note that it will be updated by init/advance calls
             self.bounds = bounds  # and, just to make sure, we also restore the boundaries to their original values
+            ray = self.ray = self.get_ray(pos_from, direction[:2])  # as well as the ray that we're moving along
             self.initialize_direction(direction, pos_from, piece)
             data = self.data.copy()
-            current_pos = pos_from
-            move = Move(
-                pos_from=pos_from, pos_to=self.transform(current_pos), movement_type=type(self)
-            ).mark(self.default_mark)
-            while self.in_bounds(self.transform(current_pos)):
+            pos_to = ray[0]
+            move = Move(pos_from=pos_from, pos_to=pos_to, movement_type=type(self)).mark(self.default_mark)
+            while self.in_bounds(pos_to):
                 if self.stop_condition(move, direction, piece, theoretical):
                     direction_id += 1
                     break
-                current_pos = add(current_pos, direction[:2])
-                move = Move(
-                    pos_from=pos_from, pos_to=self.transform(current_pos), movement_type=type(self)
-                ).mark(self.default_mark)
                 steps += 1
+                pos_to = ray[steps] if steps < len(ray) else ray[steps % (len(ray) - 1)]
+                move = Move(pos_from=pos_from, pos_to=pos_to, movement_type=type(self)).mark(self.default_mark)
                 self.data = data
                 self.steps = steps
                 self.bounds = bounds
+                self.ray = ray
                 self.advance_direction(move, direction, pos_from, piece)
                 data = self.data.copy()
                 if self.skip_condition(move, direction, piece, theoretical):
@@ -151,6 +155,7 @@ class RiderMovement(BaseMovement):
                 # this is because the step count will be reset to 0 if self.moves() is called before the next yield
                 self.data = data  # same thing for self.data, because it's also updated by successive moves() calls
                 self.bounds = bounds  # and same for self.bounds... notice the pattern yet? good. now don't forget.
+                self.ray = ray
             else:
                 direction_id += 1
 
@@ -178,7 +183,7 @@ class RiderMovement(BaseMovement):
         )
 
     def stop_condition(self, move: Move, direction: AnyDirection, piece: Piece, theoretical: bool = False) -> bool:
-        next_pos_to = self.transform(add(move.pos_from, mul(double(direction), self.steps + 1)))
+        next_pos_to = self.ray_pos(self.steps + 1)
         return (
             self.bound_stop_condition(move, direction, next_pos_to)
             or ((
@@ -276,7 +281,7 @@ class CannonRiderMovement(RiderMovement, ChangingMovement):
         return True
 
     def stop_condition(self, move: Move, direction: AnyDirection, piece: Piece, theoretical: bool = False) -> bool:
-        next_pos_to = self.transform(add(move.pos_from, mul(double(direction), self.steps + 1)))
+        next_pos_to = self.ray_pos(self.steps + 1)
         if self.data['jump'] < 0:
             if not (self.loop and move.pos_from == next_pos_to) and piece.blocked_by(self.board.get_piece(next_pos_to)):
                 return self.bound_stop_condition(move, direction, next_pos_to)
@@ -318,7 +323,7 @@ class HopperRiderMovement(CannonRiderMovement):
                 self.data['captured'].append(captured)
 
     def stop_condition(self, move: Move, direction: AnyDirection, piece: Piece, theoretical: bool = False) -> bool:
-        next_pos_to = self.transform(add(move.pos_from, mul(double(direction), self.steps + 1)))
+        next_pos_to = self.ray_pos(self.steps + 1)
         if not (self.loop and move.pos_from == next_pos_to):
             next_piece = self.board.get_piece(next_pos_to)
             if not theoretical:
@@ -378,7 +383,7 @@ class ProximityRiderMovement(RiderMovement):
 
     def stop_condition(self, move: Move, direction: AnyDirection, piece: Piece, theoretical: bool = False) -> bool:
         if not theoretical:
-            next_pos_to = self.transform(add(move.pos_from, mul(double(direction), self.steps + 1)))
+            next_pos_to = self.ray_pos(self.steps + 1)
             if not (self.loop and move.pos_from == next_pos_to) and not self.board.not_a_piece(next_pos_to):
                 return True
         return super().stop_condition(move, direction, piece, theoretical)
@@ -409,7 +414,7 @@ class SpaciousRiderMovement(RiderMovement):
     def skip_condition(self, move: Move, direction: AnyDirection, piece: Piece, theoretical: bool = False) -> bool:
         if theoretical:
             return super().skip_condition(move, direction, piece, theoretical)
-        next_pos_to = self.transform(add(move.pos_from, mul(double(direction), self.steps + 1)))
+        next_pos_to = self.ray_pos(self.steps + 1)
         check_space = self.spacious_transform(next_pos_to)
         check_state = check_space == self.spacious_transform(move.pos_from) or self.board.not_a_piece(check_space)
         return not check_state or super().skip_condition(move, direction, piece, theoretical)
@@ -501,7 +506,7 @@ class RangedCaptureRiderMovement(RangedMovement, RiderMovement):
 
     def skip_condition(self, move: Move, direction: AnyDirection, piece: Piece, theoretical: bool = False) -> bool:
         if move.captured:
-            move.pos_to = self.transform(add(move.pos_from, mul(double(direction), self.steps)))
+            move.pos_to = self.ray_pos(self.steps)
             result = super().skip_condition(move, direction, piece, theoretical)
             move.pos_to = move.pos_from
             return result
@@ -509,7 +514,7 @@ class RangedCaptureRiderMovement(RangedMovement, RiderMovement):
 
     def stop_condition(self, move: Move, direction: AnyDirection, piece: Piece, theoretical: bool = False) -> bool:
         if move.captured:
-            move.pos_to = self.transform(add(move.pos_from, mul(double(direction), self.steps)))
+            move.pos_to = self.ray_pos(self.steps)
             result = super().stop_condition(move, direction, piece, theoretical)
             move.pos_to = move.pos_from
             return result
@@ -557,39 +562,59 @@ class AutoMarkMovement(BaseMovement):
 
     mark_type = Unset
     mark_meta = None
+    marked = None  # squares marked by the movement, as {(position, theoretical): {target position}}
 
     def mark(self, pos: Position, piece: Piece, theoretical: bool = True):
+        # marks the squares the piece can move to from pos. if it has marked them before, only the squares it could not
+        # move to before get marked, and the squares it can no longer move to get unmarked
         should_generate = self.should_generate
         self.should_generate = False
-        generators = [(self.moves(pos, piece), self.board.auto_markers)]
-        if theoretical:
-            generators.append((self.moves(pos, piece, True), self.board.auto_markers_theoretical))
-        for moves, markers in generators:
-            for move in moves:
-                if move.pos_to not in markers[piece.side]:
-                    markers[piece.side][move.pos_to] = {}
-                if self.mark_type not in markers[piece.side][move.pos_to]:
-                    markers[piece.side][move.pos_to][self.mark_type] = {}
-                markers[piece.side][move.pos_to][self.mark_type][pos] = self.mark_meta
+        for is_theoretical in ((False, True) if theoretical else (False,)):
+            targets = {move.pos_to for move in self.moves(pos, piece, is_theoretical)}
+            self.set_marked(pos, piece, is_theoretical, targets)
         self.should_generate = should_generate
 
     def unmark(self, pos: Position, piece: Piece, theoretical: bool = True):
         should_generate = self.should_generate
         self.should_generate = False
-        generators = [(self.moves(pos, piece), self.board.auto_markers)]
-        if theoretical:
-            generators.append((self.moves(pos, piece, True), self.board.auto_markers_theoretical))
-        for moves, markers in generators:
-            for move in moves:
-                if move.pos_to in markers[piece.side]:
-                    if self.mark_type in markers[piece.side][move.pos_to]:
-                        markers[piece.side][move.pos_to][self.mark_type].pop(pos, None)
-                        if not markers[piece.side][move.pos_to][self.mark_type]:
-                            del markers[piece.side][move.pos_to][self.mark_type]
-                    if not markers[piece.side][move.pos_to]:
-                        del markers[piece.side][move.pos_to]
+        for is_theoretical in ((False, True) if theoretical else (False,)):
+            targets = (self.marked or {}).get((pos, is_theoretical))
+            if targets is None:
+                # marked by another copy of the movement, so the squares have to be found again
+                targets = {move.pos_to for move in self.moves(pos, piece, is_theoretical)}
+            self.set_marked(pos, piece, is_theoretical, set(), targets)
         self.should_generate = should_generate
 
+    def set_marked(
+        self, pos: Position, piece: Piece, theoretical: bool,
+        targets: set[Position], marked: set[Position] | None = None,
+    ):
+        if self.marked is None:
+            self.marked = {}
+        if marked is None:
+            marked = self.marked.get((pos, theoretical), set())
+        markers = (self.board.auto_markers_theoretical if theoretical else self.board.auto_markers)[piece.side]
+        for target in marked - targets:
+            if target in markers:
+                pos_markers = markers[target]
+                if self.mark_type in pos_markers:
+                    self.board.journal_pop(pos_markers[self.mark_type], pos)
+                    if not pos_markers[self.mark_type]:
+                        self.board.journal_pop(pos_markers, self.mark_type)
+                if not pos_markers:
+                    self.board.journal_pop(markers, target)
+        for target in targets:
+            type_markers = markers.get(target, {}).get(self.mark_type, {})
+            if pos in type_markers and type_markers[pos] == self.mark_meta:
+                continue  # already marked, most likely by this very movement
+            pos_markers = self.board.journal_setdefault(markers, target, {})
+            type_markers = self.board.journal_setdefault(pos_markers, self.mark_type, {})
+            self.board.journal_set(type_markers, pos, self.mark_meta)
+        if targets:
+            self.board.journal_set(self.marked, (pos, theoretical), targets)
+        else:
+            self.board.journal_pop(self.marked, (pos, theoretical))
+
     def update(self, move: Move, piece: Piece):
         self.unmark(move.pos_from, piece)
         self.mark(move.pos_to, piece)
@@ -785,7 +810,7 @@ class ReversiRiderMovement(RangedAutoActRiderMovement, ConvertMovement):
     def reversi_stop(self, move: Move, direction: AnyDirection, piece: Piece, theoretical: bool = False) -> bool:
         if not theoretical and self.data['state'] != 0:
             return True
-        next_pos_to = self.transform(add(move.pos_from, mul(double(direction), self.steps + 1)))
+        next_pos_to = self.ray_pos(self.steps + 1)
         return self.bound_stop_condition(move, direction, next_pos_to)
 
     def apply(self, move: Move, piece: Piece) -> Move:
@@ -868,9 +893,9 @@ class TargetMovement(BaseMovement):
             data_set.add(Delayed1)
         if isinstance(piece, Slow):
             data_set.add(Slow)
-        target_dict[target_pos] = {pos: data_set.copy() for pos in marker_poss}
+        self.board.journal_set(target_dict, target_pos, {pos: data_set.copy() for pos in marker_poss})
         for pos in marker_poss:
-            marker_dict.setdefault(pos, set()).add(target_pos)
+            self.board.journal_add(self.board.journal_setdefault(marker_dict, pos, set()), target_pos)
 
 
 class CastlingMovement(TargetMovement, ChangingMovement):
@@ -1091,6 +1116,77 @@ class BaseMultiMovement(BaseMovement):
         return self.board, unpack(self.movements)
 
 
+class BaseFlatMovement(BaseMultiMovement):
+    # ABC for composite movements that only filter and mark the moves of the movements they wrap. These can be flattened
+    # into the movement tree they are part of, so that the moves of a nested movement are copied once rather than once
+    # for every level of nesting. The flattened tree (or "plan") is a list of (movement, layers) pairs, where layers are
+    # the (composite, branch, key) triples that the moves of that movement pass through, innermost first. Branches are
+    # what the composite uses to tell its movements apart (e.g. 'move' and 'capture' for MultiMovement), and keys tell
+    # apart different places in the tree, so that gates are only checked once per place and not once per movement.
+
+    def __init__(self, board: Board, movements: Unpacked[BaseMovement] | None = None):
+        super().__init__(board, movements)
+        self.plan = None  # flattened movement tree, see compile() and moves()
+
+    def branches(self) -> list[tuple[Any, BaseMovement]]:
+        return []  # (branch, movement) pairs, in the same order as the moves of the movements are generated
+
+    def gate(self, branch: Any, pos_from: Position, piece: Piece, theoretical: bool = False) -> Any:
+        return True  # None if the movements of this branch should be skipped, else whatever admit() needs to know
+
+    def filters(self, branch: Any) -> bool:
+        return True  # False if admit() lets the moves of this branch through as they are, so it needn't be called
+
+    def admit(self, move: Move, branch: Any, gate: Any, piece: Piece, theoretical: bool = False) -> bool:
+        return True  # whether the move should be generated. marks the move along the way
+
+    def compile(self, key: tuple = ()) -> list[tuple[BaseMovement, list[tuple[BaseFlatMovement, Any, tuple]]]]:
+        plan = []
+        for i, (branch, movement) in enumerate(self.branches()):
+            layer = (self, branch, key + (i,))
+            if type(movement) in flat_movement_types:
+                plan.extend((leaf, layers + [layer]) for leaf, layers in movement.compile(key + (i,)))
+            else:
+                plan.append((movement, [layer]))
+        return plan
+
+    def moves(self, pos_from: Position, piece: Piece, theoretical: bool = False):
+        if self.plan is None:
+            # gates are checked outermost first, and only the layers that actually filter anything are kept for admit()
+            self.plan = [
+                (movement, layers[::-1], [(c.admit, branch, key) for c, branch, key in layers if c.filters(branch)])
+                for movement, layers in self.compile()
+            ]
+        gates = {}
+        for movement, layers, checks in self.plan:
+            for composite, branch, key in layers:
+                if key not in gates:
+                    gates[key] = composite.gate(branch, pos_from, piece, theoretical)
+                if gates[key] is None:
+                    break
+            else:
+                if not checks:
+                    for move in movement.moves(pos_from, piece, theoretical):
+                        yield copy(move)
+                    continue
+                if len(checks) == 1:
+                    (admit, branch, key), = checks
+                    gate = gates[key]
+                    for move in movement.moves(pos_from, piece, theoretical):
+                        move = copy(move)
+                        if admit(move, branch, gate, piece, theoretical):
+                            yield move
+                    continue
+                checks = [(admit, branch, gates[key]) for admit, branch, key in checks]
+                for move in movement.moves(pos_from, piece, theoretical):
+                    move = copy(move)
+                    for admit, branch, gate in checks:
+                        if not admit(move, branch, gate, piece, theoretical):
+                            break
+                    else:
+                        yield move
+
+
 class IndexMovement(BaseMultiMovement, ChangingMovement):
     def __init__(
         self,
@@ -1179,65 +1275,106 @@ class RepeatBentMovement(BaseMultiMovement):
         self.loop = loop
         self.cycle_mode = cycle_mode
         self.path_split = path_split
-        self.dir_indexes = [-1] * len(self.movements)
+        self.legs = None  # single-direction copies of the movements, as [[RiderMovement] | None], made on first use
+
+    def get_legs(self) -> list[list[RiderMovement] | None]:
+        # copies of each rider movement that only go in one of its directions, so that the movements don't have to be
+        # copied (and have their directions changed) every time a move is generated. anything that isn't a rider gets
+        # None, and stops the path there
+        if self.legs is None:
+            self.legs = []
+            for movement in self.movements:
+                if isinstance(movement, RiderMovement):
+                    leg = []
+                    for direction in movement.directions:
+                        leg.append(copy(movement))
+                        leg[-1].directions = [direction]
+                    self.legs.append(leg)
+                else:
+                    self.legs.append(None)
+        return self.legs
 
-    def moves(self, pos_from: Position, piece: Piece, theoretical: bool = False, index: int = 0):
-        if index == 0:
-            self.dir_indexes = [-1] * len(self.dir_indexes)
-        if self.step_count and index >= self.step_count:
-            return
-        true_index = index
-        if index >= len(self.dir_indexes):
-            if self.cycle_mode > 0:
-                index %= len(self.dir_indexes)
-            elif self.cycle_mode < 0:
-                index %= 2 * (len(self.dir_indexes) - 1)
-                if index >= len(self.dir_indexes):
-                    index = 2 * (len(self.dir_indexes) - 1) - index
-            else:
-                return
-        movement = copy(self.movements[index])  # copy movement because changing it inside the loop will likely break it
-        if isinstance(movement, RiderMovement):
-            if self.path_split:
-                self.dir_indexes[index] = -1
-            is_new = self.dir_indexes[index] < 0
-            directions = movement.directions if is_new else [movement.directions[self.dir_indexes[index]]]
-            stop = False
-            for direction in directions:
-                if is_new:
-                    for i in range(index + 1, len(self.dir_indexes)):
-                        self.dir_indexes[i] = -1
-                    self.dir_indexes[index] += 1
-                movement.directions = [direction]
+    def get_leg_indexes(self, true_index: int, count: int) -> Sequence[int]:
+        # indices of the movements that can be used for the given step of the path (none if it can't go on that far)
+        if self.step_count and true_index >= self.step_count:
+            return ()
+        if true_index < count:
+            return true_index,
+        if self.cycle_mode > 0:
+            return true_index % count,
+        if self.cycle_mode < 0:
+            index = true_index % (2 * (count - 1))
+            return (2 * (count - 1) - index if index >= count else index),
+        return ()
+
+    def moves(self, pos_from: Position, piece: Piece, theoretical: bool = False):
+        yield from self.path_moves(pos_from, piece, self.get_legs(), theoretical)
+
+    def path_moves(
+        self, pos_from: Position, piece: Piece, legs: list[list[RiderMovement] | None], theoretical: bool = False
+    ):
+        # the path is walked depth-first using a stack of the steps that are still in progress. each step is stored as
+        # [position it starts from, step number, movement index, direction indices left to try, stopped, captures made
+        # on the steps before it], and every step only uses the direction that was picked for its movement the first
+        # time it was used on the path, unless the path is allowed to split, in which case it tries all of them again
+        count = len(legs)
+        picked = [0] * count  # direction index picked for each movement on the current path
+        movement_type = type(self)
+        stack = []
+        leg_from, true_index, captured = pos_from, 0, []
+        while True:
+            for index in reversed(self.get_leg_indexes(true_index, count)):
+                if legs[index] is None:
+                    continue
+                if self.path_split or true_index < count:
+                    direction_ids = list(range(len(legs[index])))[::-1]
+                else:
+                    direction_ids = [picked[index]]
+                stack.append([leg_from, true_index, index, direction_ids, False, captured])
+            leg_from = None
+            while stack and leg_from is None:
+                step = stack[-1]
+                step_from, true_index, index, direction_ids, stop, captured = step
+                if not direction_ids:
+                    stack.pop()
+                    continue
+                direction_id = direction_ids.pop()
+                if self.path_split or true_index < count:
+                    picked[index] = direction_id
+                movement = legs[index][direction_id]
+                direction = movement.directions[0]
+                is_moving = any(direction[:2])
+                can_yield = self.start_index <= index and self.skip_count <= true_index
                 move = None
-                for move in movement.moves(pos_from, piece, theoretical):
-                    if any(direction[:2]):
+                for move in movement.moves(step_from, piece, theoretical):
+                    if is_moving:
                         pos_to = move.pos_to
                         if issubclass(move.movement_type, RangedMovement) and move.captured:
                             pos_to = movement.transform(add(move.pos_from, mul(double(direction), movement.steps)))
-                        if pos_to == pos_from:
-                            stop = True
-                    move.movement_type = type(self)
+                        if pos_to == step_from:
+                            stop = step[4] = True
+                    move.movement_type = movement_type
                     if not stop or self.loop:
-                        dir_indexes = self.dir_indexes[:]  # oh hey, remember when this very thing was in RiderMovement?
-                        if self.start_index <= index and self.skip_count <= true_index:
-                            yield copy(move)
+                        if can_yield:
+                            path_move = copy(move)
                         elif theoretical:
-                            yield copy(move).set(is_legal=False).unmark('n').mark('a')
-                        self.dir_indexes = dir_indexes  # yeah, that's still a thing.
+                            path_move = copy(move).set(is_legal=False).unmark('n').mark('a')
+                        else:
+                            path_move = None
+                        if path_move is not None:
+                            if true_index:
+                                path_move.set(pos_from=pos_from, captured=captured + path_move.captured)
+                            yield path_move
                     if stop:
                         break
                 if (
                     not stop and move is not None and (len(direction) < 3 or direction[2] and
-                    move.pos_to == add(pos_from, piece.side.direction(mul(double(direction), direction[2]))))
+                    move.pos_to == add(step_from, piece.side.direction(mul(double(direction), direction[2]))))
                     and (theoretical or not self.board.get_piece(move.pos_to).side)
                 ):
-                    for bent_move in self.moves(move.pos_to, piece, theoretical, true_index + 1):
-                        dir_indexes = self.dir_indexes[:]  # i'm not even going to bother explaining this one
-                        yield copy(bent_move).set(pos_from=pos_from, captured=move.captured + bent_move.captured)
-                        self.dir_indexes = dir_indexes  # you can probably guess what this does by now, moving on
-        else:
-            return
+                    leg_from, true_index, captured = move.pos_to, true_index + 1, captured + move.captured
+            if leg_from is None:
+                return
 
     def __copy_args__(self):
         return (
@@ -1309,26 +1446,13 @@ class SpinMovement(RepeatBentMovement):
         self.reverse = sign(reverse)
         self.movement_cycle = copy(self.movements)
 
-    def moves(self, pos_from: Position, piece: Piece, theoretical: bool = False, index: int = 0):
-        if index == 0:
-            for i in range(len(self.movement_cycle)):
-                if self.reverse >= 0:
-                    self.movements = (self.movement_cycle[i:] + self.movement_cycle[:i])[::+1]
-                    for move in super().moves(pos_from, piece, theoretical, index):
-                        movements = self.movements[:]
-                        yield move
-                        self.movements = movements
-                if self.reverse != 0:
-                    self.movements = (self.movement_cycle[i:] + self.movement_cycle[:i])[::-1]
-                    for move in super().moves(pos_from, piece, theoretical, index):
-                        movements = self.movements[:]
-                        yield move
-                        self.movements = movements
-        else:
-            for move in super().moves(pos_from, piece, theoretical, index):
-                movements = self.movements[:]
-                yield move
-                self.movements = movements
+    def moves(self, pos_from: Position, piece: Piece, theoretical: bool = False):
+        legs = self.get_legs()
+        for i in range(len(legs)):
+            if self.reverse >= 0:
+                yield from self.path_moves(pos_from, piece, (legs[i:] + legs[:i])[::+1], theoretical)
+            if self.reverse != 0:
+                yield from self.path_moves(pos_from, piece, (legs[i:] + legs[:i])[::-1], theoretical)
 
     def __copy_args__(self):
         return self.board, unpack(self.movement_cycle), self.reverse, self.start_index, self.step_count, self.loop
@@ -1352,15 +1476,12 @@ class SplitMovement(RepeatBentMovement):
             path_split=1,
         )
         self.movement_list = copy(self.movements)
-        self.dir_indexes = [-1]
 
-    def moves(self, pos_from: Position, piece: Piece, theoretical: bool = False, index: int = 0):
-        for true_index in range(len(self.movement_list)):
-            self.movements = [self.movement_list[true_index]]
-            for move in super().moves(pos_from, piece, theoretical, index):
-                movements = self.movements[:]
-                yield move
-                self.movements = movements
+    def get_leg_indexes(self, true_index: int, count: int) -> Sequence[int]:
+        # every step of the path can be made using any of the movements
+        if self.step_count and true_index >= self.step_count:
+            return ()
+        return range(count)
 
     def __copy_args__(self):
         return self.board, unpack(self.movement_list), self.step_count, self.skip_count, self.loop
@@ -1370,13 +1491,11 @@ class StageMovement(BaseMultiMovement):
     def raise_pieces(self, pieces: list[Piece]):
         for piece in pieces:
             blank = type(self.board.no_piece)(board=self.board, board_pos=piece.board_pos)
-            abs_pos = self.board.get_absolute(piece.board_pos)
-            self.board.pieces[abs_pos[0]][abs_pos[1]] = blank
+            self.board.set_piece(piece.board_pos, blank)
 
     def lower_pieces(self, pieces: list[Piece]):
         for piece in pieces:
-            abs_pos = self.board.get_absolute(piece.board_pos)
-            self.board.pieces[abs_pos[0]][abs_pos[1]] = piece
+            self.board.set_piece(piece.board_pos, piece)
 
     def moves(self, pos_from: Position, piece: Piece, theoretical: bool = False, index: int = 0):
         if index >= len(self.movements):
@@ -1487,7 +1606,7 @@ class ChainMovement(BaseMultiMovement, BaseChainMovement):
                 yield from chain_options
 
 
-class MultiMovement(BaseMultiMovement):
+class MultiMovement(BaseFlatMovement):
     def __init__(
         self,
         board: Board,
@@ -1500,57 +1619,54 @@ class MultiMovement(BaseMultiMovement):
         self.capture = repack(capture or [], list)
         super().__init__(board, [*self.both, *self.move, *self.capture])
 
-    def moves(self, pos_from: Position, piece: Piece, theoretical: bool = False):
+    def branches(self) -> list[tuple[Any, BaseMovement]]:
+        return [
+            *(('both', movement) for movement in self.both),
+            *(('move', movement) for movement in self.move),
+            *(('capture', movement) for movement in self.capture),
+        ]
+
+    def gate(self, branch: Any, pos_from: Position, piece: Piece, theoretical: bool = False) -> Any:
+        return [None] if branch == 'move' else True  # the former holds the royal en passant square to skip, if any
+
+    def filters(self, branch: Any) -> bool:
+        return branch != 'both'
+
+    def admit(self, move: Move, branch: Any, gate: Any, piece: Piece, theoretical: bool = False) -> bool:
         if theoretical:
-            for movement in self.both:
-                for move in movement.moves(pos_from, piece, theoretical):
-                    yield copy(move)
-            for movement in self.move:
-                for move in movement.moves(pos_from, piece, theoretical):
-                    yield copy(move).unmark('n').mark('m')
-            for movement in self.capture:
-                for move in movement.moves(pos_from, piece, theoretical):
-                    yield copy(move).unmark('n').mark('c')
-        else:
-            for movement in self.both:
-                for move in movement.moves(pos_from, piece, theoretical):
-                    yield copy(move)
-            for movement in self.move:
-                skip_royal_ep = None
-                for move in movement.moves(pos_from, piece, theoretical):
-                    chained_move = move
-                    while chained_move:
-                        is_legal = True
-                        captures = chained_move.captured or [self.board.get_piece(chained_move.pos_to)]
-                        for capture in captures:
-                            if piece.captures(capture) and piece != capture:
-                                is_legal = False
-                                break
-                        if not is_legal:
-                            break
-                        if skip_royal_ep is not None and (next_move := chained_move.chained_move):
-                            if next_move.pos_from == next_move.pos_to == skip_royal_ep:
-                                chained_move.chained_move = next_move.chained_move
-                                skip_royal_ep = None
-                        chained_move = chained_move.chained_move
-                    else:
-                        yield copy(move).unmark('n').mark('m')
-                    if not is_legal and chained_move.movement_type == RoyalEnPassantMovement:
-                        skip_royal_ep = chained_move.pos_to
-            for movement in self.capture:
-                for move in movement.moves(pos_from, piece, theoretical):
-                    chained_move = move
-                    while chained_move:
+            move.unmark('n').mark('m' if branch == 'move' else 'c')
+            return True
+        if branch == 'move':
+            chained_move = move
+            while chained_move:
+                is_legal = True
+                captures = chained_move.captured or [self.board.get_piece(chained_move.pos_to)]
+                for capture in captures:
+                    if piece.captures(capture) and piece != capture:
                         is_legal = False
-                        captures = chained_move.captured or [self.board.get_piece(chained_move.pos_to)]
-                        for capture in captures:
-                            if piece.captures(capture):
-                                is_legal = True
-                                break
-                        if is_legal:
-                            yield copy(move).unmark('n').mark('c')
-                            break
-                        chained_move = chained_move.chained_move
+                        break
+                if not is_legal:
+                    break
+                if gate[0] is not None and (next_move := chained_move.chained_move):
+                    if next_move.pos_from == next_move.pos_to == gate[0]:
+                        chained_move.chained_move = next_move.chained_move
+                        gate[0] = None
+                chained_move = chained_move.chained_move
+            else:
+                move.unmark('n').mark('m')
+                return True
+            if chained_move.movement_type == RoyalEnPassantMovement:
+                gate[0] = chained_move.pos_to
+            return False
+        chained_move = move
+        while chained_move:
+            captures = chained_move.captured or [self.board.get_piece(chained_move.pos_to)]
+            for capture in captures:
+                if piece.captures(capture):
+                    move.unmark('n').mark('c')
+                    return True
+            chained_move = chained_move.chained_move
+        return False
 
     def __copy_args__(self):
         return self.board, unpack(self.both), unpack(self.move), unpack(self.capture)
@@ -1650,9 +1766,7 @@ class MultiEnPassantTargetMovement(BaseMultiMovement, TargetMovement):
             yield from movement.moves(pos_from, piece, theoretical)
 
     def update(self, move: Move, piece: Piece):
-        tester = copy(piece)
-        tester.blocked_by = lambda p: False
-        tester.captures = lambda p: p.side
+        tester = piece.tester()
         move_found = False
         for movement, target_movement in self.movement_pairs:
             for tester_move in movement.moves(move.pos_from, tester, False):
@@ -1745,7 +1859,7 @@ class CloneMovement(BaseMultiMovement):
         return self.board, unpack(self.movements), self.move, self.capture
 
 
-class ColorMovement(BaseMultiMovement):
+class ColorMovement(BaseFlatMovement):
     def __init__(
         self,
         board: Board,
@@ -1756,23 +1870,22 @@ class ColorMovement(BaseMultiMovement):
         self.dark = repack(dark or [], list)
         super().__init__(board, [*self.light, *self.dark])
 
-    def moves(self, pos_from: Position, piece: Piece, theoretical: bool = False):
-        if (legal := self.board.is_light_square(pos_from)) or theoretical:
-            for movement in self.light:
-                for move in movement.moves(pos_from, piece, theoretical):
-                    move.movement_type = type(self)
-                    yield copy(move).set(is_legal=legal).unmark('n').mark('w')
-        if (legal := self.board.is_dark_square(pos_from)) or theoretical:
-            for movement in self.dark:
-                for move in movement.moves(pos_from, piece, theoretical):
-                    move.movement_type = type(self)
-                    yield copy(move).set(is_legal=legal).unmark('n').mark('b')
+    def branches(self) -> list[tuple[Any, BaseMovement]]:
+        return [*(('w', movement) for movement in self.light), *(('b', movement) for movement in self.dark)]
+
+    def gate(self, branch: Any, pos_from: Position, piece: Piece, theoretical: bool = False) -> Any:
+        legal = self.board.is_light_square(pos_from) if branch == 'w' else self.board.is_dark_square(pos_from)
+        return legal if legal or theoretical else None
+
+    def admit(self, move: Move, branch: Any, gate: Any, piece: Piece, theoretical: bool = False) -> bool:
+        move.set(movement_type=type(self), is_legal=gate).unmark('n').mark(branch)
+        return True
 
     def __copy_args__(self):
         return self.board, unpack(self.light), unpack(self.dark)
 
 
-class SideMovement(BaseMultiMovement):
+class SideMovement(BaseFlatMovement):
     def __init__(
         self,
         board: Board,
@@ -1787,57 +1900,58 @@ class SideMovement(BaseMultiMovement):
         self.top = repack(top or [], list)
         super().__init__(board, [*self.left, *self.right, *self.bottom, *self.top])
 
-    def moves(self, pos_from: Position, piece: Piece, theoretical: bool = False):
-        if (legal := pos_from[1] < ceil(self.board.board_width / 2) - self.board.notation_offset[0]) or theoretical:
-            for movement in self.left:
-                for move in movement.moves(pos_from, piece, theoretical):
-                    move.movement_type = type(self)
-                    yield copy(move).set(is_legal=legal).unmark('n').mark('[')
-        if (legal := pos_from[1] >= floor(self.board.board_width / 2) - self.board.notation_offset[0]) or theoretical:
-            for movement in self.right:
-                for move in movement.moves(pos_from, piece, theoretical):
-                    move.movement_type = type(self)
-                    yield copy(move).set(is_legal=legal).unmark('n').mark(']')
-        position = pos_from[0] * piece.side.direction()
-        if (
-            legal := position <
-            ceil(self.board.board_height / 2) * piece.side.direction() - self.board.notation_offset[1]
-        ) or theoretical:
-            for movement in self.bottom:
-                for move in movement.moves(pos_from, piece, theoretical):
-                    move.movement_type = type(self)
-                    yield copy(move).set(is_legal=legal).unmark('n').mark('(')
-        if (
-            legal := position >=
-            floor(self.board.board_height / 2) * piece.side.direction() - self.board.notation_offset[1]
-        ) or theoretical:
-            for movement in self.top:
-                for move in movement.moves(pos_from, piece, theoretical):
-                    move.movement_type = type(self)
-                    yield copy(move).set(is_legal=legal).unmark('n').mark(')')
+    def branches(self) -> list[tuple[Any, BaseMovement]]:
+        return [
+            *(('[', movement) for movement in self.left),
+            *((']', movement) for movement in self.right),
+            *(('(', movement) for movement in self.bottom),
+            *((')', movement) for movement in self.top),
+        ]
+
+    def gate(self, branch: Any, pos_from: Position, piece: Piece, theoretical: bool = False) -> Any:
+        if branch == '[':
+            legal = pos_from[1] < ceil(self.board.board_width / 2) - self.board.notation_offset[0]
+        elif branch == ']':
+            legal = pos_from[1] >= floor(self.board.board_width / 2) - self.board.notation_offset[0]
+        else:
+            position = pos_from[0] * piece.side.direction()
+            if branch == '(':
+                legal = position < (
+                    ceil(self.board.board_height / 2) * piece.side.direction() - self.board.notation_offset[1]
+                )
+            else:
+                legal = position >= (
+                    floor(self.board.board_height / 2) * piece.side.direction() - self.board.notation_offset[1]
+                )
+        return legal if legal or theoretical else None
+
+    def admit(self, move: Move, branch: Any, gate: Any, piece: Piece, theoretical: bool = False) -> bool:
+        move.set(movement_type=type(self), is_legal=gate).unmark('n').mark(branch)
+        return True
 
     def __copy_args__(self):
         return self.board, unpack(self.left), unpack(self.right), unpack(self.bottom), unpack(self.top)
 
 
-class ProbabilisticMovement(BaseMultiMovement):
-    def moves(self, pos_from: Position, piece: Piece, theoretical: bool = False):
-        if theoretical:
-            movements = self.movements
-        else:
+class ProbabilisticMovement(BaseFlatMovement):
+    def branches(self) -> list[tuple[Any, BaseMovement]]:
+        return list(enumerate(self.movements))
+
+    def gate(self, branch: Any, pos_from: Position, piece: Piece, theoretical: bool = False) -> Any:
+        if not theoretical:
             try:
                 current_ply = self.board.ply_count + self.board.ply_simulation - 1
-                current_roll = self.board.roll_history[current_ply][pos_from]
-                movements = [None if i != current_roll else self.movements[i] for i in range(len(self.movements))]
+                if self.board.roll_history[current_ply][pos_from] != branch:
+                    return None
             except IndexError:
-                movements = self.movements
+                pass
             except KeyError:
-                movements = self.movements
-        for i, movement in enumerate(movements):
-            if movement is None:
-                continue
-            for move in movement.moves(pos_from, piece, theoretical):
-                yield copy(move).unmark('n').mark('7' * (i + 1) + '/' + '7' * len(movements))
+                pass
+        return '7' * (branch + 1) + '/' + '7' * len(self.movements)
+
+    def admit(self, move: Move, branch: Any, gate: Any, piece: Piece, theoretical: bool = False) -> bool:
+        move.unmark('n').mark(gate)
+        return True
 
     def roll(self):
         return self.board.roll_rng.randrange(len(self.movements))
@@ -1858,29 +1972,29 @@ class BaseChoiceMovement(BaseMultiMovement):
         return self.board, {key: unpack(value) for key, value in self.movement_dict.items()}
 
 
-class ChoiceMovement(BaseChoiceMovement, ChangingLegalMovement):
-    def moves(self, pos_from: Position, piece: Piece, theoretical: bool = False):
-        for key in self.movement_dict:
-            value, invert = (key[1:], True) if key.startswith('!') else (key, False)
-            for movement in self.movement_dict[key]:
-                for move in movement.moves(pos_from, piece, theoretical):
-                    if key == '*':
-                        yield copy(move)
-                    else:
-                        legal = False
-                        mark = 'i!' if invert else 'i'
-                        captures = move.captured[:]
-                        to_piece = self.board.get_piece(move.pos_to)
-                        if to_piece.side and piece.captures(to_piece) and not move.swapped_piece:
-                            captures.append(to_piece)
-                        if not value:
-                            if not captures != invert:
-                                legal = True
-                        elif any(piece.captures(x) and self.board.fits(value, x) for x in captures) != invert:
-                            legal = True
-                        if not theoretical and not legal:
-                            continue
-                        yield copy(move).set(is_legal=legal).unmark('n').mark(mark)
+class ChoiceMovement(BaseChoiceMovement, BaseFlatMovement, ChangingLegalMovement):
+    def branches(self) -> list[tuple[Any, BaseMovement]]:
+        return [(key, movement) for key, movements in self.movement_dict.items() for movement in movements]
+
+    def filters(self, branch: Any) -> bool:
+        return branch != '*'
+
+    def admit(self, move: Move, branch: Any, gate: Any, piece: Piece, theoretical: bool = False) -> bool:
+        value, invert = (branch[1:], True) if branch.startswith('!') else (branch, False)
+        legal = False
+        captures = move.captured[:]
+        to_piece = self.board.get_piece(move.pos_to)
+        if to_piece.side and piece.captures(to_piece) and not move.swapped_piece:
+            captures.append(to_piece)
+        if not value:
+            if not captures != invert:
+                legal = True
+        elif any(piece.captures(x) and self.board.fits(value, x) for x in captures) != invert:
+            legal = True
+        if not theoretical and not legal:
+            return False
+        move.set(is_legal=legal).unmark('n').mark('i!' if invert else 'i')
+        return True
 
 
 class ChoiceActMovement(AutoActMovement, ChoiceMovement, BaseChainMovement):
@@ -1963,9 +2077,7 @@ class RelayMovement(BaseChoiceMovement, ChangingLegalMovement):
     def moves(self, pos_from: Position, piece: Piece, theoretical: bool = False):
         relay_target_dict = self.board.relay_targets.get(piece.side, {})
         relay_source_dict = self.board.relay_sources.get(piece.side, {})
-        tester = copy(piece)
-        tester.blocked_by = lambda p: False
-        tester.captures = lambda p: p.side
+        tester = piece.tester()
         lookup_result = set()
         for lookup in self.lookup:
             lookup_dict = relay_target_dict.setdefault(lookup, {})
@@ -2041,9 +2153,7 @@ class CoordinateMovement(BaseChoiceMovement):
         relay_source_dict = self.board.relay_sources.get(piece.side, {})
         coord_target_dict = self.board.coordinate_targets.get(piece.side, {})
         coord_source_dict = self.board.coordinate_sources.get(piece.side, {})
-        tester = copy(piece)
-        tester.blocked_by = lambda p: False
-        tester.captures = lambda p: p.side
+        tester = piece.tester()
         lookup_result = set()
         for lookup in self.lookup:
             lookup_dict = relay_target_dict.setdefault(lookup, {})
@@ -2053,7 +2163,7 @@ class CoordinateMovement(BaseChoiceMovement):
                     lookup_dict[pos_from].add(move.pos_to)
                     relay_source_dict.setdefault(move.pos_to, {}).setdefault(lookup, set()).add(pos_from)
             lookup_result.update(lookup_dict[pos_from])
-        tester.captures = lambda p: False
+        tester.capturing = False
         coordinate_poss = set()
         for key in self.movement_dict:
             if key in '!':
@@ -2079,9 +2189,7 @@ class CoordinateMovement(BaseChoiceMovement):
                             yield from partner_dict[partner_pos]
                             continue
                         partner_dict[partner_pos] = set()
-                        partner_tester = copy(new_partner)
-                        partner_tester.blocked_by = lambda p: False
-                        partner_tester.captures = lambda p: False
+                        partner_tester = new_partner.tester(False)
                         for partner_move in movements[1].moves(partner_pos, partner_tester, theoretical):
                             pos_to = partner_move.pos_to
                             partner_dict[partner_pos].add(pos_to)
@@ -2277,18 +2385,13 @@ class ImitatorMovement(ChangingMovement):
             if not offset:
                 continue
             (abs_offsets if offset < 0 else rel_offsets).add(abs(offset))
-        for offsets, history in (
-            (abs_offsets, self.board.move_history),
-            (rel_offsets, self.board.move_history[::-1])
-        ):
-            offset, min_offset, max_offset = 0, min(offsets), max(offsets)
-            for move in history:
-                if not move:
-                    offset += 1
-                elif not move.is_edit:
-                    offset += 1
-                    if offset < min_offset or offset > max_offset:
-                        continue
+        history = self.board.move_history
+        for offsets, direction in ((abs_offsets, 1), (rel_offsets, -1)):
+            if not offsets:
+                continue
+            for offset in range(min(offsets), min(max(offsets), len(history.plies)) + 1):
+                move = history.ply(offset * direction)
+                if move:
                     if issubclass(move.movement_type or type, DropMovement):
                         if not self.skip_drop and move.promotion:
                             movements.append(self.board.get_piece(move.pos_to).movement)
@@ -2317,6 +2420,16 @@ passive_movements = (
     AutoActMovement,
 )
 
+# Composite movements that can be flattened into the movement tree they are part of (see BaseFlatMovement.compile())
+flat_movement_types = {
+    MultiMovement,
+    ColorMovement,
+    SideMovement,
+    ProbabilisticMovement,
+    RandomMovement,
+    ChoiceMovement,
+}
+
 is_active = lambda move: (
     move and not move.is_edit and move.pos_from and move.pos_to and
     (move.pos_from != move.pos_to or move.movement_type and not issubclass(move.movement_type, passive_movements))
@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+from argparse import ArgumentParser
+from time import perf_counter
+
+from chess.data import piece_groups
+from chess.game import GameState
+from chess.movement.move import Move
+from chess.pieces.side import Side
+
+# perft = "performance test", i.e. counting all leaf nodes of the game tree up to a given depth. the numbers themselves
+# are mostly useful for catching move generation regressions, and the time it takes to get them is the benchmark part
+
+
+def new_state(
+    white: int | None = None,
+    black: int | None = None,
+    save_path: str | None = None,
+    roll_seed: int | None = 0,
+) -> GameState:
+    state = GameState(save_path)
+    state.verbose = None  # no need to print every single move we make
+    state.do_auto_save = False  # and definitely no need to save them
+    state.auto_moves = False  # also, we want to make every move ourselves
+    if save_path is None or not state.save_imported:
+        if roll_seed is not None:
+            # fixed seed so that probabilistic armies roll the same way every time (given the same move order, that is)
+            state.roll_seed = roll_seed
+            state.roll_rng = None
+        if white is not None:
+            state.piece_set_ids[Side.WHITE] = white
+        if black is not None:
+            state.piece_set_ids[Side.BLACK] = black
+        state.chaos_mode = 0
+        state.reset_custom_data()
+        state.reset_board()
+    return state
+
+
+def legal_moves(state: GameState) -> list[Move]:
+    if state.game_over or state.edit_mode:
+        return []
+    return sum(state.unique_moves()[state.turn_side].values(), [])
+
+
+def perft(state: GameState, depth: int, counts: list[int] | None = None, ply: int = 0) -> int:
+    if counts is not None:
+        while len(counts) <= ply:
+            counts.append(0)
+        counts[ply] += 1
+    if depth <= 0:
+        return 1
+    moves = legal_moves(state)
+    if depth == 1 and counts is None:
+        return len(moves)  # no need to make the moves just to count them
+    nodes = 0
+    for move in moves:
+        nodes += make_and_count(state, move, depth - 1, counts, ply + 1)
+    return nodes
+
+
+def make_and_count(state: GameState, move: Move, depth: int, counts: list[int] | None = None, ply: int = 0) -> int:
+    log_size, verbose_size = len(state.log_data), len(state.verbose_data)
+    state.auto(move, update=False)
+    if state.promotion_piece is not None:
+        nodes = 0  # a promotion that still needs to be picked by hand, we can't go on from here (undo handles it)
+    else:
+        nodes = perft(state, depth, counts, ply)
+    state.undo_last_move()
+    del state.log_data[log_size:]
+    del state.verbose_data[verbose_size:]
+    return nodes
+
+
+def divide(state: GameState, depth: int) -> tuple[dict[str, int], list[int]]:
+    # same as perft(), but with node counts for every root move (and every ply) listed separately
+    results = {}
+    counts = [1]
+    future_move_history = state.future_move_history.copy()
+    for move in legal_moves(state):
+        results[str(move)] = results.get(str(move), 0) + make_and_count(state, move, depth - 1, counts, 1)
+    state.future_move_history = future_move_history
+    return results, counts
+
+
+def run(state: GameState, depth: int, show_divide: bool = False) -> tuple[int, float]:
+    start = perf_counter()
+    if show_divide:
+        results, counts = divide(state, depth)
+        nodes = sum(results.values())
+    else:
+        future_move_history = state.future_move_history.copy()
+        counts = None
+        nodes = perft(state, depth)
+        state.future_move_history = future_move_history
+    elapsed = perf_counter() - start
+    if show_divide:
+        for string, count in results.items():
+            print(f"  {string}: {count}")
+        print(f"  Plies: {', '.join(f'{ply}: {count}' for ply, count in enumerate(counts))}")
+    print(f"  Nodes: {nodes}, time: {elapsed:.3f}s, nodes/sec: {nodes / elapsed if elapsed else 0:.0f}")
+    return nodes, elapsed
+
+
+def main() -> None:
+    parser = ArgumentParser(description="Count the game tree leaf nodes from a given starting position.")
+    parser.add_argument('-d', '--depth', type=int, default=2, help="search depth in plies (default: 2)")
+    parser.add_argument('-w', '--white', type=int, default=0, help="white army index in piece_groups (default: 0)")
+    parser.add_argument('-b', '--black', type=int, default=None, help="black army index (default: same as white)")
+    parser.add_argument('-a', '--all', action='store_true', help="go through every possible army pairing")
+    parser.add_argument('-s', '--save', default=None, help="load the starting position from a save file instead")
+    parser.add_argument('-r', '--roll-seed', type=int, default=0, help="roll seed for probabilistic movement")
+    parser.add_argument('--divide', action='store_true', help="show node counts for every root move and ply")
+    args = parser.parse_args()
+
+    if args.save:
+        pairings = [(None, None)]
+    elif args.all:
+        pairings = [(w, b) for w in range(len(piece_groups)) for b in range(len(piece_groups))]
+    else:
+        pairings = [(args.white, args.white if args.black is None else args.black)]
+
+    total_nodes, total_time = 0, 0.0
+    for white, black in pairings:
+        state = new_state(white, black, args.save, args.roll_seed)
+        if args.save:
+            print(f"{args.save} (depth {args.depth})")
+        else:
+            print(f"{state.piece_set_names[Side.WHITE]} vs. {state.piece_set_names[Side.BLACK]} (depth {args.depth})")
+        nodes, elapsed = run(state, args.depth, args.divide)
+        total_nodes += nodes
+        total_time += elapsed
+    if len(pairings) > 1:
+        print(f"Total nodes: {total_nodes}, time: {total_time:.3f}s, nodes/sec: {total_nodes / total_time:.0f}")
+
+
+if __name__ == '__main__':
+    main()
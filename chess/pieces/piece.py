@@ -33,6 +33,7 @@ class AbstractPiece(object, metaclass=PieceMeta):
     name = '(Piece)'
     type_data = None
     group_data = None
+    key_cache = {}  # keys of every piece type used in template matching, shared between types because groups are too
 
     def __init__(
         self,
@@ -78,16 +79,32 @@ class AbstractPiece(object, metaclass=PieceMeta):
     def __deepcopy__(self, memo):
         return self.__copy__()
 
-    def of(self, side: Side) -> AbstractPiece:
+    def of(self, side: Side, **kwargs) -> AbstractPiece:
         clone = type(self)(
             board=self.board,
             board_pos=self.board_pos,
             side=side if not isinstance(self, Neutral) else None,
+            **kwargs
         )
         clone.movement = copy(self.movement)
         clone.promoted_from = self.promoted_from
         return clone
 
+    def clone(self) -> AbstractPiece:
+        # same as copy(), but without a sprite, for pieces that are only kept around for bookkeeping (e.g. move history)
+        return self.of(self.side, use_sprite=False)
+
+    def tester(self, capturing: bool = True) -> AbstractPiece:
+        # stand-in for the piece when looking up which squares its movements can reach (see Tester). unlike copy(), it
+        # has no sprite and shares the movement of the piece instead of copying it, since lookups only ever read from it
+        tester_type = tester_types.get(type(self))
+        if tester_type is None:
+            tester_type = tester_types[type(self)] = type(type(self).__name__, (Tester, type(self)), {})
+        tester = tester_type.__new__(tester_type)
+        tester.__dict__.update(self.__dict__)
+        tester.capturing = capturing
+        return tester
+
     def on(self, board_pos: Position | None) -> AbstractPiece:
         clone = copy(self)
         clone.board_pos = board_pos
@@ -217,10 +234,12 @@ class AbstractPiece(object, metaclass=PieceMeta):
         if cls.group_data is None:
             cls.group_data = set()
         cls.group_data.add(group)
+        cls.key_cache.clear()
 
     @classmethod
     def clear_groups(cls) -> None:
         cls.group_data = None
+        cls.key_cache.clear()
 
     @classmethod
     def type_str(cls) -> str | None:
@@ -232,6 +251,21 @@ class AbstractPiece(object, metaclass=PieceMeta):
         return cls.type_data
 
 
+class Tester(object):
+    # Mixin for pieces that are used to look up which squares a movement can reach, whatever might be standing there.
+    # Testers are never blocked, and either capture any piece that is not an empty square or do not capture at all.
+    capturing = True
+
+    def blocked_by(self, what: AbstractPiece):
+        return False
+
+    def captures(self, what: AbstractPiece):
+        return what.side if self.capturing else False
+
+
+tester_types = {}  # tester versions of piece types, as {piece type: tester type}
+
+
 class Piece(AbstractPiece):
     file_name = 'none'
     asset_folder = 'util'
@@ -242,6 +276,7 @@ class Piece(AbstractPiece):
         movement: BaseMovement | None = None,
         board_pos: Position | None = None,
         side: Side | None = None,
+        use_sprite: bool = True,
         **kwargs
     ):
         super().__init__(
@@ -257,13 +292,24 @@ class Piece(AbstractPiece):
         self.texture_name = self.file_name
         self.texture_side = Side.NEUTRAL if isinstance(self, Neutral) else side if side is not None else Side.NONE
         self.alternate = False
+        self.sprite = None  # pieces only get a sprite if the board is being displayed
+        if self.board.use_sprites and use_sprite:
+            self.sprite = Sprite(normalize(self.texture_path()))
+            if self.board_pos is not None:
+                self.sprite.position = self.board.get_screen_position(self.board_pos)
+
+    def load_sprite(self) -> None:
+        # pieces that were cloned without a sprite get one as soon as they need to be displayed
+        if self.sprite is not None or not self.board.use_sprites:
+            return
         self.sprite = Sprite(normalize(self.texture_path()))
+        self.set_size(self.board.square_size)
         if self.board_pos is not None:
             self.sprite.position = self.board.get_screen_position(self.board_pos)
 
-    def of(self, side: Side) -> AbstractPiece:
-        clone = super().of(side)
-        if isinstance(clone, Piece):
+    def of(self, side: Side, **kwargs) -> AbstractPiece:
+        clone = super().of(side, **kwargs)
+        if isinstance(clone, Piece) and clone.sprite is not None and self.sprite is not None:
             clone.sprite.scale = self.sprite.scale
         clone.should_hide = self.should_hide
         clone.is_hidden = self.is_hidden
@@ -271,7 +317,7 @@ class Piece(AbstractPiece):
 
     def on(self, board_pos: Position | None) -> AbstractPiece:
         clone = super().on(board_pos)
-        if board_pos is not None and isinstance(clone, Piece):
+        if board_pos is not None and isinstance(clone, Piece) and clone.sprite is not None:
             clone.sprite.position = self.board.get_screen_position(board_pos)
         return clone
 
@@ -305,11 +351,13 @@ class Piece(AbstractPiece):
         self.texture_side = side or self.texture_side
         self.texture_name = file_name or self.texture_name
         self.alternate = alternate
-        texture_path = normalize(self.texture_path())
         if flipped_horizontally is not None:
             self.flipped_horizontally = flipped_horizontally
         if flipped_vertically is not None:
             self.flipped_vertically = flipped_vertically
+        if self.sprite is None:
+            return
+        texture_path = normalize(self.texture_path())
         if self.sprite.texture.file_path.resolve() != texture_path:
             size = self.size
             color = self.sprite.color
@@ -320,10 +368,12 @@ class Piece(AbstractPiece):
 
     @property
     def size(self):
+        if self.sprite is None:
+            return 0
         return abs(self.sprite.scale_x) * self.sprite.texture.width
 
     def set_size(self, size: float):
-        if size <= 0:
+        if size <= 0 or self.sprite is None:
             return
         self.sprite.scale = size / self.sprite.texture.width
         if self.flipped_horizontally:
@@ -332,7 +382,7 @@ class Piece(AbstractPiece):
             self.sprite.scale_y *= -1
 
     def set_color(self, color: Color, force_color: bool = False):
-        if not self.name:
+        if not self.name or self.sprite is None:
             return
         # NB: color changes are applied to sprites as a multiplicative filter, so black texture parts will remain black
         # because of this, colored pieces need to have the white piece textures in order to be displayed as their color
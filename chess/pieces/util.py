@@ -54,7 +54,8 @@ class BackgroundPiece(Piece, UtilityPiece):
         self.set_color()
 
     def set_color(self, *args, **kwargs):
-        self.sprite.color = self.board.color_scheme.get('wall_color', self.board.color_scheme['background_color'])
+        if self.sprite is not None:
+            self.sprite.color = self.board.color_scheme.get('wall_color', self.board.color_scheme['background_color'])
 
 
 class Shield(BackgroundPiece, Empty):
@@ -78,9 +79,9 @@ class NoSidePiece(UtilityPiece):
         kwargs['side'] = self.default_side
         super().__init__(board, **kwargs)
 
-    def of(self, side: Side) -> AbstractPiece:
+    def of(self, side: Side, **kwargs) -> AbstractPiece:
         side = self.default_side
-        return super().of(side)
+        return super().of(side, **kwargs)
 
 
 class NoPiece(NoSidePiece, Empty):
@@ -242,6 +242,7 @@ def load_piece(
     from_dict: dict | None = None,
     last: str | None = None,
     is_promotion: bool = False,
+    use_sprite: bool = True,
 ) -> AbstractPiece | frozenset | None:
     if not data:
         return None
@@ -255,6 +256,7 @@ def load_piece(
         board=board,
         board_pos=fra(data['pos']) if 'pos' in data else None,
         side=side,
+        use_sprite=use_sprite,
     )
     piece.promoted_from = load_piece_type(data.get('from'), from_dict, last)
     piece.set_moves(None, data.get('moves', None if is_promotion else 0))
@@ -262,7 +264,8 @@ def load_piece(
         show_piece = data.get('show')
         if show_piece is not None:
             piece.is_hidden = piece.should_hide = not show_piece
-        piece.sprite.scale = board.square_size / piece.sprite.texture.width
+        if piece.sprite is not None:
+            piece.sprite.scale = board.square_size / piece.sprite.texture.width
         if not isinstance(piece, NoPiece):
             board.update_piece(piece)
     return piece
@@ -435,7 +438,8 @@ def load_move(board: Board, data: dict | str | None, from_dict: dict | None) ->
         return Unset
     pos_from = fra(data['from']) if 'from' in data else None
     pos_to = fra(data['to']) if 'to' in data else None
-    piece = load_piece(board, data.get('piece'), from_dict)
+    # pieces in the move history only get sprites if they get put back on the board
+    piece = load_piece(board, data.get('piece'), from_dict, use_sprite=False)
     if not piece:
         piece = NoPiece(board, board_pos=pos_to or pos_from)
     elif not piece.board_pos:
@@ -443,11 +447,11 @@ def load_move(board: Board, data: dict | str | None, from_dict: dict | None) ->
     captured = []
     capture_data = repack(data.get('captured', []), list)
     for capture_dict in capture_data:
-        if capture := load_piece(board, capture_dict, from_dict):
+        if capture := load_piece(board, capture_dict, from_dict, use_sprite=False):
             if not capture.board_pos:
                 capture.board_pos = pos_to
             captured.append(capture)
-    swapped = load_piece(board, data.get('swapped'), from_dict)
+    swapped = load_piece(board, data.get('swapped'), from_dict, use_sprite=False)
     if swapped and not swapped.board_pos:
         swapped.board_pos = pos_from
     return Move(
@@ -458,7 +462,7 @@ def load_move(board: Board, data: dict | str | None, from_dict: dict | None) ->
         captured=captured,
         swapped_piece=swapped,
         placed_piece=load_piece_type(data.get('drop'), from_dict),
-        promotion=load_piece(board, data.get('promotion'), from_dict, piece.type_str(), True),
+        promotion=load_piece(board, data.get('promotion'), from_dict, piece.type_str(), True, False),
         chained_move=load_move(board, data.get('chain'), from_dict),
         is_edit=data.get('edit', 0),
         tag=data.get('tag', None),
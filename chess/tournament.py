@@ -0,0 +1,255 @@
+from __future__ import annotations
+
+import csv
+import json
+import os
+from argparse import ArgumentParser
+from itertools import chain
+from multiprocessing import Pool
+from random import Random
+from time import perf_counter
+from typing import Callable
+
+from chess.data import piece_groups
+from chess.engine import Engine
+from chess.game import GameState
+from chess.mcts import Mcts
+from chess.movement.move import Move
+from chess.perft import legal_moves, new_state
+from chess.pieces.side import Side
+
+# self-play tournaments, for seeing how the armies (and chaos modes) fare against each other. games are spread over a
+# pool of worker processes, each with a game state and players of its own, and every result is appended to a file as
+# soon as the game is over, so that a tournament that got interrupted can be picked up by simply running it again
+
+Player = Callable[[GameState], Move | None]
+
+player_types = ['random', 'engine', 'mcts']
+results = ['1-0', '1/2-1/2', '0-1']
+
+worker_states = []  # game state of the current worker process, reused for every game it plays
+worker_players = {}  # players of the current worker process, as {Side: Player}
+worker_settings = {}  # tournament settings of the current worker process
+
+
+def chaos_name(mode: int) -> str:
+    return f"Chaos mode {mode}"
+
+
+def army_name(army: int, chaos: int = 0) -> str:
+    return chaos_name(chaos) if chaos else piece_groups[army]['name']
+
+
+def new_player(kind: str, settings: dict) -> tuple[Player, Callable[[int], None]]:
+    # returns the player itself and a function that reseeds it before every game
+    if kind == 'engine':
+        engine = Engine(None, settings['time'], settings['depth'], settings['nodes'])
+        return engine.search, lambda seed: engine.killers.clear()
+    if kind == 'mcts':
+        mcts = Mcts(None, settings['playouts'], settings['time'], seed=0)
+        return mcts.search, mcts.rng.seed
+    rng = Random(0)
+    return lambda state: (lambda moves: rng.choice(moves) if moves else None)(legal_moves(state)), rng.seed
+
+
+def init_worker(white: str, black: str, settings: dict) -> None:
+    worker_states.append(new_state())
+    worker_settings.update(settings)
+    worker_players[Side.WHITE] = new_player(white, settings)
+    worker_players[Side.BLACK] = new_player(black, settings)
+
+
+def play_game(task: tuple[int, int, int, int, int]) -> dict:
+    white, black, chaos, game, seed = task
+    record = {'white': white, 'black': black, 'chaos': chaos, 'game': game, 'seed': seed}
+    start = perf_counter()
+    try:
+        state = worker_states[0]
+        state.log_data.clear()
+        state.verbose_data.clear()
+        state.roll_seed = seed
+        state.roll_rng = None
+        if chaos:
+            state.chaos_rng = Random(seed)
+            state.load_chaos_sets(chaos, False)
+        else:
+            state.piece_set_ids = {Side.WHITE: white, Side.BLACK: black}
+            state.chaos_mode = 0
+            state.reset_custom_data()
+            state.reset_board()
+        record['white_set'] = state.piece_set_names[Side.WHITE]
+        record['black_set'] = state.piece_set_names[Side.BLACK]
+        for player, reseed in worker_players.values():
+            reseed(seed)
+        plies = 0
+        while not state.game_over and plies < worker_settings['max_plies']:
+            if state.promotion_piece is not None:
+                break  # a promotion that can't be picked without the board, which shouldn't happen with auto_moves off
+            move = worker_players[state.turn_side][0](state)
+            if move is None:
+                break
+            state.auto(move, update=False)
+            plies += 1
+        if state.game_over and state.win_side in {Side.WHITE, Side.BLACK}:
+            record['result'] = results[0] if state.win_side == Side.WHITE else results[2]
+        else:
+            record['result'] = results[1]  # draws, and also games that went on for too long
+        if state.game_over:
+            record['condition'] = str(state.end_condition)
+        else:
+            record['condition'] = 'max plies' if plies >= worker_settings['max_plies'] else 'stuck'
+        record['plies'] = plies
+    except Exception as e:
+        # one broken army shouldn't bring down the whole tournament. the game will be played again on the next run
+        record['result'] = None
+        record['condition'] = f"{type(e).__name__}: {e}"
+    record['time'] = round(perf_counter() - start, 3)
+    return record
+
+
+def load_records(path: str) -> dict[tuple[int, int, int, int], dict]:
+    records = {}
+    if not os.path.isfile(path):
+        return records
+    with open(path, mode='r', encoding='utf-8') as file:
+        for line in file:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # most likely the last line of a run that was cut short
+            records[record['white'], record['black'], record['chaos'], record['game']] = record
+    return records
+
+
+def new_cell() -> dict:
+    return {'games': 0, 'wins': 0, 'draws': 0, 'losses': 0, 'conditions': {}, 'lengths': []}
+
+
+def summarize(records: list[dict]) -> tuple[dict[str, dict[str, dict]], dict[str, dict]]:
+    # returns the results of the armies against each other (white army -> black army -> stats) and those of the chaos
+    # modes (mode -> stats). chaos sets are different for every game, so their results are only tallied by side
+    matrix, chaos = {}, {}
+    for record in records:
+        if record.get('result') not in results:
+            continue
+        if record['chaos']:
+            cell = chaos.setdefault(chaos_name(record['chaos']), new_cell())
+        else:
+            white = army_name(record['white'])
+            black = army_name(record['black'])
+            cell = matrix.setdefault(white, {}).setdefault(black, new_cell())
+        cell['games'] += 1
+        cell[['wins', 'draws', 'losses'][results.index(record['result'])]] += 1
+        cell['conditions'][record['condition']] = cell['conditions'].get(record['condition'], 0) + 1
+        cell['lengths'].append(record['plies'])
+    for cell in chain(chain.from_iterable(row.values() for row in matrix.values()), chaos.values()):
+        lengths = cell.pop('lengths')
+        cell['score'] = round((cell['wins'] + cell['draws'] / 2) / cell['games'], 4)
+        cell['min_plies'] = min(lengths)
+        cell['max_plies'] = max(lengths)
+        cell['avg_plies'] = round(sum(lengths) / len(lengths), 2)
+    return matrix, chaos
+
+
+def save_summary(matrix: dict[str, dict[str, dict]], chaos: dict[str, dict], path: str) -> None:
+    # the results go to a json file (along with the totals of every army), and a flat version of them to a csv file.
+    # chaos games are listed with both sides named after the mode, their wins and losses being those of white
+    armies = {}
+    for white, row in matrix.items():
+        for black, cell in row.items():
+            for army, sign in ((white, 1), (black, -1)):
+                if sign < 0 and black == white:
+                    break  # mirror games are counted once, or every win would also be counted as a loss
+                total = armies.setdefault(army, {'games': 0, 'wins': 0, 'draws': 0, 'losses': 0})
+                total['games'] += cell['games']
+                total['wins'] += cell['wins' if sign > 0 else 'losses']
+                total['draws'] += cell['draws']
+                total['losses'] += cell['losses' if sign > 0 else 'wins']
+    for total in armies.values():
+        total['score'] = round((total['wins'] + total['draws'] / 2) / total['games'], 4)
+    with open(f"{path}.json", mode='w', encoding='utf-8') as file:
+        json.dump({'matrix': matrix, 'armies': armies, 'chaos': chaos}, file, indent=2, ensure_ascii=False)
+    fields = ['white', 'black', 'games', 'wins', 'draws', 'losses', 'score', 'min_plies', 'max_plies', 'avg_plies']
+    with open(f"{path}.csv", mode='w', encoding='utf-8', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(fields)
+        for white, row in matrix.items():
+            for black, cell in row.items():
+                writer.writerow([white, black] + [cell[field] for field in fields[2:]])
+        for mode, cell in chaos.items():
+            writer.writerow([mode, mode] + [cell[field] for field in fields[2:]])
+
+
+def main() -> None:
+    parser = ArgumentParser(description="Play self-play games between armies and tally up the results.")
+    parser.add_argument('-g', '--games', type=int, default=1, help="games per pairing (default: 1)")
+    parser.add_argument('-a', '--armies', type=int, nargs='*', default=None, help="army indices (default: all)")
+    parser.add_argument('-c', '--chaos', type=int, nargs='*', default=[], help="chaos modes to play as well (1-4)")
+    parser.add_argument(
+        '-p', '--players', choices=player_types, nargs='+', default=['random'],
+        help="white and black player types (default: random for both)",
+    )
+    parser.add_argument('-t', '--time', type=float, default=None, help="seconds per move for engine/mcts players")
+    parser.add_argument('-d', '--depth', type=int, default=None, help="search depth in plies for engine players")
+    parser.add_argument('-n', '--nodes', type=int, default=None, help="positions per move for engine players")
+    parser.add_argument('-l', '--playouts', type=int, default=100, help="playouts per move for mcts players")
+    parser.add_argument('-m', '--max-plies', type=int, default=300, help="plies before a game is drawn (default: 300)")
+    parser.add_argument('-j', '--processes', type=int, default=None, help="worker processes (default: all CPUs)")
+    parser.add_argument('-o', '--output', default='tournament', help="output path without extension")
+    parser.add_argument('--seed', type=int, default=0, help="seed for rolls, chaos sets and random players")
+    args = parser.parse_args()
+
+    armies = list(range(len(piece_groups))) if args.armies is None else args.armies
+    pairings = [(white, black, 0) for white in armies for black in armies]
+    pairings += [(-1, -1, mode) for mode in args.chaos]
+    white_player, black_player = (args.players * 2)[:2]
+    settings = {
+        'time': args.time, 'depth': args.depth, 'nodes': args.nodes,
+        'playouts': args.playouts, 'max_plies': args.max_plies,
+    }
+    if args.time is None and args.depth is None and args.nodes is None:
+        settings['depth'] = 2  # the engine would think for 5 seconds a move otherwise, which is a bit much here
+
+    log_path = f"{args.output}.jsonl"
+    records = load_records(log_path)
+    seeds = Random(args.seed)
+    tasks = []
+    for white, black, chaos in pairings:
+        for game in range(args.games):
+            seed = seeds.randint(0, 2 ** 32 - 1)  # drawn even for games that are done, so that they keep their seeds
+            record = records.get((white, black, chaos, game))
+            if record is None or record.get('result') not in results:
+                tasks.append((white, black, chaos, game, seed))
+    total = len(pairings) * args.games
+    print(f"Games: {total}, done: {total - len(tasks)}, to play: {len(tasks)}")
+
+    cut_short = False
+    if os.path.isfile(log_path) and os.path.getsize(log_path):
+        with open(log_path, mode='rb') as file:
+            file.seek(-1, os.SEEK_END)
+            cut_short = file.read() != b'\n'
+
+    start = perf_counter()
+    if tasks:
+        with Pool(args.processes, init_worker, (white_player, black_player, settings)) as pool:
+            with open(log_path, mode='a', encoding='utf-8') as file:
+                if cut_short:
+                    file.write('\n')  # so that the line that got cut short doesn't take the next record down with it
+                for count, record in enumerate(pool.imap_unordered(play_game, tasks), 1):
+                    file.write(json.dumps(record, ensure_ascii=False) + '\n')
+                    file.flush()
+                    records[record['white'], record['black'], record['chaos'], record['game']] = record
+                    white = army_name(record['white'], record['chaos'])
+                    black = army_name(record['black'], record['chaos'])
+                    outcome = record['result'] or f"error ({record['condition']})"
+                    print(f"[{count}/{len(tasks)}] {white} vs. {black}, game {record['game'] + 1}: {outcome}")
+    elapsed = perf_counter() - start
+
+    matrix, chaos = summarize(list(records.values()))
+    save_summary(matrix, chaos, args.output)
+    errors = sum(record.get('result') not in results for record in records.values())
+    print(f"Time: {elapsed:.3f}s, errors: {errors}, results saved to {args.output}.csv and {args.output}.json")
+
+
+if __name__ == '__main__':
+    main()
@@ -5,10 +5,11 @@ from collections import defaultdict
 from collections.abc import Collection, Mapping, Sequence
 from copy import copy
 from datetime import datetime
+from functools import lru_cache
 from itertools import chain
 from json import dumps as json_dumps
 from tkinter import Tk, filedialog, simpledialog
-from typing import Any, TypeAlias, TypeVar, Union
+from typing import Any, Callable, TypeAlias, TypeVar, Union
 
 # Lambda function to return the sign of a number. Returns +1 for positive numbers, -1 for negative numbers, and 0 for 0.
 sign = lambda x: (x > 0) - (x < 0)
@@ -216,6 +217,37 @@ def find(data: Index[T] | AnyJsonType, *fields: Key) -> Collection[T] | None:
         return ()
 
 
+# Function to turn a template into a matching function. Parsing the wildcards is only done once for every template.
+@lru_cache(maxsize=4096)
+def compile_template(template: str) -> Callable[[str], bool]:
+    if template == '':
+        return lambda data: data == ''
+    if template == '*':
+        return lambda data: True
+    if '*' not in template:
+        return lambda data: data == template
+    template_start = template[0] == '*'
+    template_end = template[-1] == '*'
+    part = template.strip('*')
+    if '*' in part:
+        keys = part.split('*')
+        def match(data: str) -> bool:
+            if data == template:
+                return True
+            if not template_start and not data.startswith(keys[0]):
+                return False
+            if not template_end and not data.endswith(keys[-1]):
+                return False
+            indexes = [data.find(key) for key in keys]
+            return all(index >= 0 for index in indexes) and indexes == sorted(indexes)
+        return match
+    if template_start and template_end:
+        return lambda data: data == template or part in data
+    if template_start:
+        return lambda data: data == template or data.endswith(part)
+    return lambda data: data == template or data.startswith(part)
+
+
 # Simple template matching function. Matches an object or a group thereof with a template, and treats '*' as a wildcard.
 def fits(template: str, data: Any) -> bool:
     if data is None:
@@ -226,31 +258,10 @@ def fits(template: str, data: Any) -> bool:
         return True
     if not isinstance(data, str):
         if isinstance(data, Collection):
-            return any(fits(template, s) for s in data)
+            match = compile_template(template)
+            return any(fits(template, s) if not isinstance(s, str) else match(s) for s in data)
         data = str(data)
-    if template == data:
-        return True
-    if '*' not in template:
-        return False
-    template_start = template[0] == '*'
-    template_end = template[-1] == '*'
-    template = template.strip('*')
-    template_middle = '*' in template
-    if template_middle:
-        keys = template.split('*')
-        if not template_start and not data.startswith(keys[0]):
-            return False
-        if not template_end and not data.endswith(keys[-1]):
-            return False
-        indexes = [data.find(key) for key in keys]
-        return all(index >= 0 for index in indexes) and indexes == sorted(indexes)
-    if template_start and template_end:
-        return template in data
-    if template_start:
-        return data.endswith(template)
-    if template_end:
-        return data.startswith(template)
-    return False
+    return compile_template(template)(data)
 
 
 # Function to check if a string contains another string as a prefix, a suffix, or a substring, optionally ignoring case.